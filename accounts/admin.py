@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.utils import timezone
 from django.utils.html import format_html
-from django.db.models import Count, Avg
-from board.models import Candidate, Exam, Question, Answer, Result
+from django.db.models import (
+    Case, Count, F, FloatField, OuterRef, Prefetch, Subquery, When)
+from board.models import (
+    Candidate, CandidateImage, CandidateStats, Exam, ExamStats, Question, Answer, Result)
 from .models import User
 
 class CandidateInline(admin.StackedInline):
@@ -53,11 +56,26 @@ class UserAdmin(BaseUserAdmin):
         return f"{obj.first_name} {obj.last_name}"
     full_name.short_description = 'Full Name'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            Prefetch(
+                'candidate_profile__images',
+                queryset=CandidateImage.objects.filter(is_primary=True).exclude(thumbnail=''),
+                to_attr='primary_thumbnails'
+            )
+        )
+
     def profile_image(self, obj):
-        if obj.profile_picture:
-            return format_html('<img src="{}" width="50" height="50" style="border-radius: 50%;" />', 
-                             obj.profile_picture.url)
-        return "No Image"
+        # Prefer the candidate's resized primary image over the full-size upload
+        candidate = getattr(obj, 'candidate_profile', None)
+        thumbnails = getattr(candidate, 'primary_thumbnails', None)
+        if thumbnails:
+            url = thumbnails[0].thumbnail.url
+        elif obj.profile_picture:
+            url = obj.profile_picture.url
+        else:
+            return "No Image"
+        return format_html('<img src="{}" width="50" height="50" style="border-radius: 50%;" />', url)
     profile_image.short_description = 'Profile Picture'
 
 @admin.register(Candidate)
@@ -68,20 +86,26 @@ class CandidateAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'user__email', 
                     'user__first_name', 'user__last_name')
     readonly_fields = ('exam_count', 'avg_score', 'last_exam_date')
+    list_select_related = ['user', 'stats']
 
     def exam_count(self, obj):
-        return Result.objects.filter(candidate=obj).count()
+        stats = getattr(obj, 'stats', None)
+        return stats.attempts if stats else 0
     exam_count.short_description = 'Exams Taken'
+    exam_count.admin_order_field = 'stats__attempts'
 
     def avg_score(self, obj):
-        avg = Result.objects.filter(candidate=obj).aggregate(Avg('score'))['score__avg']
-        return f"{avg:.1f}%" if avg else "No exams"
+        stats = getattr(obj, 'stats', None)
+        avg = stats.average_score if stats else None
+        return f"{avg:.1f}%" if avg is not None else "No exams"
     avg_score.short_description = 'Average Score'
+    avg_score.admin_order_field = 'stats__average_score'
 
     def last_exam_date(self, obj):
-        last_result = Result.objects.filter(candidate=obj).order_by('-id').first()
-        return last_result.created_at if last_result else "No exams"
+        stats = getattr(obj, 'stats', None)
+        return (stats.last_completed_at if stats else None) or "No exams"
     last_exam_date.short_description = 'Last Exam Date'
+    last_exam_date.admin_order_field = 'stats__last_completed_at'
 
 class AnswerInline(admin.TabularInline):
     model = Answer
@@ -94,15 +118,26 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ('exam', 'created_at')
     search_fields = ('text', 'exam__title')
     inlines = [AnswerInline]
+    list_select_related = ['exam']
+
+    def get_queryset(self, request):
+        correct_answers = Answer.objects.filter(
+            question=OuterRef('pk'), is_correct=True
+        ).order_by('created_at')
+        return super().get_queryset(request).annotate(
+            _answer_count=Count('answers'),
+            _correct_answer=Subquery(correct_answers.values('text')[:1]),
+        )
 
     def answer_count(self, obj):
-        return obj.answers.count()
+        return obj._answer_count
     answer_count.short_description = 'Total Answers'
+    answer_count.admin_order_field = '_answer_count'
 
     def correct_answer(self, obj):
-        correct = obj.answers.filter(is_correct=True).first()
-        return correct.text if correct else "No correct answer set"
+        return obj._correct_answer or "No correct answer set"
     correct_answer.short_description = 'Correct Answer'
+    correct_answer.admin_order_field = '_correct_answer'
 
 @admin.register(Exam)
 class ExamAdmin(admin.ModelAdmin):
@@ -112,30 +147,44 @@ class ExamAdmin(admin.ModelAdmin):
     search_fields = ('title',)
     actions = ['activate_exams', 'deactivate_exams']
 
+    list_select_related = ['stats']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _pass_rate=Case(
+                When(stats__attempts__gt=0,
+                     then=F('stats__passes') * 100.0 / F('stats__attempts')),
+                default=None,
+                output_field=FloatField(),
+            )
+        )
+
     def question_count(self, obj):
-        return obj.questions.count()
+        return obj.total_questions
     question_count.short_description = 'Questions'
+    question_count.admin_order_field = 'total_questions'
 
     def total_attempts(self, obj):
-        return obj.result_set.count()
+        stats = getattr(obj, 'stats', None)
+        return stats.attempts if stats else 0
     total_attempts.short_description = 'Total Attempts'
+    total_attempts.admin_order_field = 'stats__attempts'
 
     def pass_rate(self, obj):
-        total = obj.result_set.count()
-        if total:
-            passed = obj.result_set.filter(is_passed=True).count()
-            return f"{(passed/total)*100:.1f}%"
+        if obj._pass_rate is not None:
+            return f"{obj._pass_rate:.1f}%"
         return "No attempts"
     pass_rate.short_description = 'Pass Rate'
+    pass_rate.admin_order_field = '_pass_rate'
 
     @admin.action(description='Activate selected exams')
     def activate_exams(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = queryset.update(is_active=True, modified_at=timezone.now())
         self.message_user(request, f'{updated} exams were activated.')
 
     @admin.action(description='Deactivate selected exams')
     def deactivate_exams(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = queryset.update(is_active=False, modified_at=timezone.now())
         self.message_user(request, f'{updated} exams were deactivated.')
 
 @admin.register(Result)
@@ -145,6 +194,14 @@ class ResultAdmin(admin.ModelAdmin):
     list_filter = ('is_passed', 'created_at', 'exam')
     search_fields = ('candidate__user__username', 'exam__title')
     readonly_fields = ('is_passed', 'created_at')
+    list_select_related = ['candidate__user', 'exam']
+
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes bypass Result.delete, so rebuild the affected rollups.
+        affected = list(queryset.values_list('exam_id', 'candidate_id'))
+        super().delete_queryset(request, queryset)
+        ExamStats.rebuild({exam_id for exam_id, _ in affected})
+        CandidateStats.rebuild({candidate_id for _, candidate_id in affected})
 
     def certificate_link(self, obj):
         if obj.is_passed:
@@ -165,4 +222,5 @@ admin.site.index_title = 'Welcome to Exam Administration'
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ('question', 'text', 'is_correct')
     search_fields = ('text',)
+    list_select_related = ['question']
 
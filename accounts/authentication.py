@@ -0,0 +1,135 @@
+import copy
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class Principal:
+    """
+    Who is making the request, resolved once per request: the role flags
+    and the caller's candidate id, so views and permissions compare ids
+    instead of loading related rows.
+    """
+    def __init__(self, user_id, is_staff=False, is_candidate=False, candidate=None):
+        self.user_id = user_id
+        self.is_staff = is_staff
+        self.is_candidate = is_candidate
+        self.candidate = candidate
+        self.candidate_id = candidate.pk if candidate is not None else None
+
+    @property
+    def is_admin(self):
+        return self.is_staff and not self.is_candidate
+
+    @classmethod
+    def for_user(cls, user):
+        if not user.is_authenticated:
+            return cls(None)
+        try:
+            candidate = user.candidate_profile
+        except ObjectDoesNotExist:
+            candidate = None
+        return cls(user.pk, user.is_staff, user.is_candidate, candidate)
+
+
+def get_principal(request):
+    """
+    The request's Principal. CachedJWTAuthentication attaches it to the
+    user; other authentication paths build it here on first use.
+    """
+    user = request.user
+    principal = getattr(user, 'principal', None)
+    if principal is None:
+        principal = Principal.for_user(user)
+        user.principal = principal
+    return principal
+
+
+class UserCache:
+    """
+    Short-lived in-process cache of user rows (with their candidate profile)
+    keyed by user id. Entries are evicted on user or candidate changes in
+    this process; the TTL bounds staleness across processes.
+    """
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return getattr(settings, 'AUTH_USER_CACHE', {})
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._data.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        # Each request gets its own copy, so request-level changes to the
+        # user instance never leak into other requests.
+        return copy.copy(entry[1])
+
+    def set(self, user_id, user):
+        expires = time.monotonic() + self.config.get('TTL', 60)
+        with self._lock:
+            if len(self._data) >= self.config.get('MAXSIZE', 10000):
+                now = time.monotonic()
+                self._data = {key: entry for key, entry in self._data.items() if entry[0] >= now}
+                if len(self._data) >= self.config.get('MAXSIZE', 10000):
+                    self._data.clear()
+            self._data[user_id] = (expires, user)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that serves the user row from user_cache, so
+    authenticated requests skip the per-request user lookup. The active and
+    password-change checks still run on every request, and the request's
+    Principal is attached to the returned user.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related('candidate_profile').get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_cache.set(user_id, user)
+            user = copy.copy(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        user.principal = Principal.for_user(user)
+        return user
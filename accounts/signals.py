@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from board.models import Candidate
+from .authentication import user_cache
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_cached_candidate_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.user_id)
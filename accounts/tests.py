@@ -1,3 +1,69 @@
-from django.test import TestCase
+from unittest import mock
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from board.models import Candidate
+from .authentication import CachedJWTAuthentication, user_cache
+from .models import User
 
-# Create your tests here.
+
+@override_settings(AUTH_USER_CACHE={'TTL': 60, 'MAXSIZE': 100})
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create(
+            username='candidate1', email='candidate1@example.com', phone_number='07001',
+            is_candidate=True
+        )
+        self.candidate = Candidate.objects.create(user=self.user, phone='07001')
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'JWT {self.token}')
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_cache_hit_skips_queries(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.principal.candidate_id, self.candidate.pk)
+
+    def test_user_and_candidate_saves_evict(self):
+        self.authenticate()
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
+        self.assertEqual(self.authenticate().first_name, 'Renamed')
+
+        self.candidate.phone = '07002'
+        self.candidate.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_inactive_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_each_request_gets_its_own_copy(self):
+        first = self.authenticate()
+        first.first_name = 'Changed'
+        second = self.authenticate()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.first_name, '')
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch('accounts.authentication.time.monotonic', return_value=1000):
+            self.authenticate()
+        with mock.patch('accounts.authentication.time.monotonic', return_value=1059):
+            with self.assertNumQueries(0):
+                self.authenticate()
+        with mock.patch('accounts.authentication.time.monotonic', return_value=1061):
+            self.assertIsNone(user_cache.get(self.user.pk))
+            with self.assertNumQueries(1):
+                self.authenticate()
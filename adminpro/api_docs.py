@@ -8,7 +8,7 @@ email_send_schema = {
         properties={
             'to': openapi.Schema(
                 type=openapi.TYPE_STRING, 
-                description='Email recipient address'
+                description='Recipient address, a comma-separated list or a JSON array of addresses'
             ),
             'subject': openapi.Schema(
                 type=openapi.TYPE_STRING, 
@@ -29,6 +29,14 @@ email_send_schema = {
                     'status': openapi.Schema(
                         type=openapi.TYPE_STRING,
                         description='Success message'
+                    ),
+                    'notification': openapi.Schema(
+                        type=openapi.TYPE_INTEGER,
+                        description='Notification ID for tracking delivery status'
+                    ),
+                    'recipients': openapi.Schema(
+                        type=openapi.TYPE_INTEGER,
+                        description='Number of recipients queued'
                     )
                 }
             )
@@ -64,6 +72,12 @@ email_send_schema = {
 candidate_list_schema = {
     'operation_summary': 'List Candidates',
     'operation_description': 'List all candidates based on permissions',
+    'manual_parameters': [
+        openapi.Parameter(
+            'include', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+            description="Pass 'primary_image' to embed each candidate's primary image"
+        ),
+    ],
     'responses': {
         200: openapi.Response(
             description='Successful retrieval of candidates',
@@ -79,6 +93,15 @@ candidate_list_schema = {
                         'email': openapi.Schema(type=openapi.TYPE_STRING),
                         'phone': openapi.Schema(type=openapi.TYPE_STRING),
                         'address': openapi.Schema(type=openapi.TYPE_STRING),
+                        'primary_image': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            description='Only with include=primary_image',
+                            properties={
+                                'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'image': openapi.Schema(type=openapi.TYPE_STRING),
+                                'thumbnail': openapi.Schema(type=openapi.TYPE_STRING),
+                            }
+                        ),
                     }
                 )
             )
@@ -270,6 +293,62 @@ exam_submit_schema = {
     }
 }
 
+exam_bulk_submit_schema = {
+    'operation_summary': 'Bulk Submit Exam',
+    'operation_description': 'Submit many candidates\' answers for an exam in one request',
+    'request_body': openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['submissions'],
+        properties={
+            'submissions': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['candidate', 'answers'],
+                    properties={
+                        'candidate': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'answers': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            additionalProperties=openapi.Schema(type=openapi.TYPE_INTEGER),
+                            description='Question IDs mapped to answer IDs'
+                        ),
+                        'completed_at': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
+                    }
+                )
+            ),
+        }
+    ),
+    'responses': {
+        200: openapi.Response(
+            description='Per-submission outcomes',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'index': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'candidate': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'status': openapi.Schema(type=openapi.TYPE_STRING, enum=['created', 'rejected']),
+                                'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'score': openapi.Schema(type=openapi.TYPE_NUMBER),
+                                'is_passed': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                                'error': openapi.Schema(type=openapi.TYPE_STRING),
+                            }
+                        )
+                    ),
+                }
+            )
+        ),
+        400: openapi.Response(
+            description='Invalid submission payload',
+            schema=openapi.Schema(type=openapi.TYPE_OBJECT)
+        ),
+    }
+}
+
 # Question schemas
 question_list_schema = {
     'operation_summary': 'List Questions',
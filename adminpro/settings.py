@@ -170,6 +170,15 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Limits checked while candidate images stream in, and the sizes of the
+# WebP variants rendered by board.tasks.generate_image_variants
+CANDIDATE_IMAGE_UPLOAD = {
+    'MAX_BYTES': 100 * 1024,
+    'MAX_DIMENSION': 4096,
+    'THUMBNAIL_SIZE': 128,
+    'PREVIEW_SIZE': 512,
+}
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -177,12 +186,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = 'accounts.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'EXCEPTION_HANDLER': 'core.utils.custom_exception_handler',
+    'DEFAULT_PAGINATION_CLASS': 'board.pagination.DefaultPagination',
+    'PAGE_SIZE': 10,
 }
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('JWT',),
@@ -192,6 +203,11 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
+# In-process cache of authenticated users, see accounts.authentication
+AUTH_USER_CACHE = {
+    'TTL': 60,
+    'MAXSIZE': 10000,
+}
 
 DJOSER = {
     'SERIALIZERS': {
@@ -214,15 +230,77 @@ EMAIL_PORT = os.getenv('EMAIL_PORT')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+if os.getenv('REDIS_CACHE_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_CACHE_URL'),
+    }
+
+# Exam answer-key / structure cache (board.cache). Entries live in a local
+# LRU and, when SHARED_ALIAS names a configured cache, in that backend too.
+BOARD_CACHE = {
+    'LOCAL_MAXSIZE': 512,
+    'SHARED_ALIAS': 'shared' if 'shared' in CACHES else None,
+    'TIMEOUT': 60 * 60,
+}
+
 ADMINS = [
     
 ]
 
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
+# Number of results rendered per board.tasks.generate_certificates task
+CERTIFICATE_BATCH_SIZE = 50
+# Notification tasks live in core/task.py, which autodiscovery does not find
+CELERY_IMPORTS = ['core.task']
+# Recipients per core.task.send_delivery_batch task, each batch reuses one SMTP connection
+NOTIFICATION_BATCH_SIZE = 100
+# Celery rate limit per worker for send_delivery_batch
+NOTIFICATION_RATE_LIMIT = '30/m'
+# Failed recipients are retried after 60s, 120s, 240s, ... up to this many attempts
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BACKOFF = 60
+# Deliveries claimed for sending longer ago than this (seconds) are released
+# by core.task.reap_stale_deliveries
+NOTIFICATION_CLAIM_TIMEOUT = 15 * 60
+# Saves and finalizes up to this many seconds after an attempt's deadline still count
+EXAM_ATTEMPT_GRACE_SECONDS = 5
+# Outbox events handled per board.tasks.drain_outbox transaction
+OUTBOX_BATCH_SIZE = 500
+# Write-behind buffer for attempt autosaves (board.answer_buffer). Uses the
+# Celery Redis unless ANSWER_BUFFER_REDIS_URL is set; without Redis autosaves
+# are written straight to the database.
+ANSWER_BUFFER = {
+    'REDIS_URL': os.getenv('ANSWER_BUFFER_REDIS_URL') or (
+        CELERY_BROKER_URL if (CELERY_BROKER_URL or '').startswith(('redis://', 'rediss://')) else None
+    ),
+    'FLUSH_BATCH_SIZE': 500,
+}
 CELERY_BEAT_SCHEDULE = {
-    'notify_customer': {
-        'task': 'core.task.notify_customer',
-        'schedule': 5,
-        'args': ['New task'],
-    }
+    # Safety net for events whose on-commit kick was lost
+    'drain_outbox': {
+        'task': 'board.tasks.drain_outbox',
+        'schedule': 60,
+    },
+    'flush_answer_buffer': {
+        'task': 'board.tasks.flush_answer_buffer',
+        'schedule': 10,
+    },
+    'finalize_expired_attempts': {
+        'task': 'board.tasks.finalize_expired_attempts',
+        'schedule': 60,
+    },
+    'reap_stale_deliveries': {
+        'task': 'core.task.reap_stale_deliveries',
+        'schedule': 5 * 60,
+    },
+    'reconcile_exam_stats': {
+        'task': 'board.tasks.reconcile_exam_stats',
+        'schedule': 60 * 60,
+    },
 }
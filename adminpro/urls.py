@@ -20,6 +20,8 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from core import views
+from board.storage import CAS_PREFIX
+from board.views import serve_content
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -38,6 +40,7 @@ schema_view = get_schema_view(
 )
 
 urlpatterns = [
+    path(f"{settings.MEDIA_URL.lstrip('/')}{CAS_PREFIX}/<path:path>", serve_content, name='content-file'),
     path("mails/", include('core.urls')),
     path("admin/", admin.site.urls),
     path('api/', include('board.urls')),
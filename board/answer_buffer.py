@@ -0,0 +1,130 @@
+import threading
+from django.conf import settings
+
+KEY_PREFIX = 'board:answers'
+
+# Move an attempt from the dirty set to the flushing set and merge its live
+# hash into its flushing hash. Data left in the flushing hash by a flush that
+# crashed is older, so live values overwrite it.
+TAKE_SCRIPT = """
+redis.call('SREM', KEYS[3], ARGV[1])
+redis.call('SADD', KEYS[4], ARGV[1])
+local live = redis.call('HGETALL', KEYS[1])
+for i = 1, #live, 2 do
+    redis.call('HSET', KEYS[2], live[i], live[i + 1])
+end
+redis.call('DEL', KEYS[1])
+return redis.call('HGETALL', KEYS[2])
+"""
+
+# Drop the flushed values, keeping any that a concurrent take replaced.
+ACK_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[2], ARGV[1])
+end
+"""
+
+
+def encode(answers):
+    return {
+        str(question_id): '' if answer_id is None else str(answer_id)
+        for question_id, answer_id in answers.items()
+    }
+
+
+def decode(fields):
+    return {
+        int(question_id): int(answer_id) if answer_id else None
+        for question_id, answer_id in fields.items()
+    }
+
+
+class RedisAnswerBuffer:
+    """
+    Write-behind buffer for attempt autosaves, kept in Redis.
+
+    Each attempt has a hash of question_id -> answer_id, so repeated saves
+    of a question coalesce into one field, and its id is added to a dirty
+    set. A flush moves the hash aside to a flushing key, writes it to the
+    database and only then deletes it. If the flush dies in between, the
+    id stays in the flushing set and the next flush writes it again.
+    A cleared answer is stored as an empty string.
+    """
+    def __init__(self, url, prefix=KEY_PREFIX):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.take_script = self.client.register_script(TAKE_SCRIPT)
+        self.ack_script = self.client.register_script(ACK_SCRIPT)
+        self.prefix = prefix
+        self.dirty_key = f'{prefix}:dirty'
+        self.flushing_key = f'{prefix}:flushing'
+
+    def live_key(self, attempt_id):
+        return f'{self.prefix}:{attempt_id}'
+
+    def flushing_hash_key(self, attempt_id):
+        return f'{self.prefix}:{attempt_id}:flushing'
+
+    def save(self, attempt_id, answers):
+        """Buffer answers; returns everything pending for the attempt."""
+        pipe = self.client.pipeline()
+        pipe.hset(self.live_key(attempt_id), mapping=encode(answers))
+        pipe.sadd(self.dirty_key, attempt_id)
+        pipe.hgetall(self.flushing_hash_key(attempt_id))
+        pipe.hgetall(self.live_key(attempt_id))
+        _, _, flushing, live = pipe.execute()
+        return decode({**flushing, **live})
+
+    def pending(self, attempt_id):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self.flushing_hash_key(attempt_id))
+        pipe.hgetall(self.live_key(attempt_id))
+        flushing, live = pipe.execute()
+        return decode({**flushing, **live})
+
+    def attempt_ids(self):
+        """Attempts with buffered answers, including ones a failed flush left behind."""
+        return {int(attempt_id) for attempt_id in self.client.sunion(self.dirty_key, self.flushing_key)}
+
+    def take(self, attempt_id):
+        fields = self.take_script(
+            keys=[
+                self.live_key(attempt_id), self.flushing_hash_key(attempt_id),
+                self.dirty_key, self.flushing_key
+            ],
+            args=[attempt_id]
+        )
+        return decode(dict(zip(fields[::2], fields[1::2])))
+
+    def ack(self, attempt_id, answers):
+        args = [attempt_id]
+        for question_id, answer_id in encode(answers).items():
+            args += [question_id, answer_id]
+        self.ack_script(keys=[self.flushing_hash_key(attempt_id), self.flushing_key], args=args)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_answer_buffer():
+    """
+    The process-wide Redis answer buffer, or None when ANSWER_BUFFER has no
+    REDIS_URL. Without Redis, autosaves are written straight to the database:
+    an in-process buffer would be invisible to the Celery workers that flush
+    and finalize attempts.
+    """
+    global _buffer
+    config = getattr(settings, 'ANSWER_BUFFER', {})
+    if not config.get('REDIS_URL'):
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = RedisAnswerBuffer(config['REDIS_URL'])
+    return _buffer
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from .grading import AnswerKey
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExamCache:
+    """
+    Per-exam cache: a local LRU in front of an optional shared Django cache.
+
+    Keys include Exam.content_version, so any change to the exam, its
+    questions or its answers makes old entries unreachable in every process
+    without an explicit delete.
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.config = getattr(settings, 'BOARD_CACHE', {})
+        self.local = LRUCache(self.config.get('LOCAL_MAXSIZE', 512))
+
+    @property
+    def shared(self):
+        alias = self.config.get('SHARED_ALIAS')
+        return caches[alias] if alias else None
+
+    def make_key(self, exam, *parts):
+        return ':'.join(
+            str(part) for part in ('board', self.prefix, exam.pk, exam.content_version) + parts
+        )
+
+    def get_or_build(self, exam, build, *parts):
+        key = self.make_key(exam, *parts)
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        shared = self.shared
+        if shared is not None:
+            value = shared.get(key)
+        if value is None:
+            value = build()
+            if shared is not None:
+                shared.set(key, value, self.config.get('TIMEOUT', 60 * 60))
+        self.local.set(key, value)
+        return value
+
+
+answer_keys = ExamCache('answer-key')
+exam_structures = ExamCache('exam-structure')
+exam_payloads = ExamCache('exam-payload')
+
+
+def get_answer_key(exam):
+    """Cached AnswerKey for an exam; hits the database only on a miss."""
+    return answer_keys.get_or_build(exam, lambda: AnswerKey.load(exam.pk))
+
+
+def get_exam_structure(exam, build, audience):
+    """Cached question/answer tree for exam detail, per audience."""
+    return exam_structures.get_or_build(exam, build, audience)
+
+
+def get_exam_payload(exam, build, audience):
+    """Pre-rendered exam detail JSON bytes, per audience."""
+    return exam_payloads.get_or_build(exam, build, audience)
+
+
+def exam_payload_etag(exam, audience):
+    return f'"exam-{exam.pk}-{exam.content_version}-{audience}"'
@@ -0,0 +1,130 @@
+import hashlib
+import re
+from functools import lru_cache
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from .storage import content_storage
+
+PLACEHOLDERS = {
+    'name': b'@@name@@',
+    'score': b'@@score@@',
+    'date': b'@@date@@',
+}
+
+
+def draw_certificate(c, name, exam_title, score, completed_on):
+    """Lay out a certificate page on a ReportLab canvas."""
+    c.drawString(100, 750, "Certificate of Completion")
+    c.drawString(100, 700,
+        f"This certifies that {name} "
+        f"has passed the {exam_title} exam with {score}%.")
+    c.drawString(100, 650,
+        f"Completed on: {completed_on}")
+
+
+def render_certificate_pdf(name, exam_title, score, completed_on, **canvas_options):
+    """Render a certificate from scratch into PDF bytes."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4, **canvas_options)
+    draw_certificate(c, name, exam_title, score, completed_on)
+    c.save()
+    return buffer.getvalue()
+
+
+def escape_pdf_text(value):
+    """Encode a value as the body of a PDF literal string (WinAnsi)."""
+    data = str(value).encode('cp1252')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class CertificateTemplate:
+    """
+    A certificate rendered once per exam with placeholder fields.
+
+    The static page (fonts, page tree, layout, exam title) is built a single
+    time with an uncompressed content stream. Each certificate is produced by
+    splicing the candidate's fields into that stream and patching the stream
+    /Length and xref offsets, which avoids rebuilding the PDF object tree.
+    """
+    def __init__(self, exam_title):
+        self.exam_title = exam_title
+        pdf = render_certificate_pdf(
+            PLACEHOLDERS['name'].decode(), exam_title,
+            PLACEHOLDERS['score'].decode(), PLACEHOLDERS['date'].decode(),
+            pageCompression=0, invariant=1,
+        )
+
+        marker = pdf.index(PLACEHOLDERS['name'])
+        stream_start = pdf.rindex(b'stream\n', 0, marker) + len(b'stream\n')
+        stream_end = pdf.index(b'endstream', marker)
+        length = re.compile(rb'/Length (\d+)').search(pdf, pdf.rindex(b' obj', 0, marker))
+        xref_start = pdf.index(b'\nxref\n', stream_end) + 1
+        startxref = pdf.index(b'startxref\n', xref_start)
+
+        self.head = pdf[:length.start(1)]
+        self.length_pos = length.start(1)
+        self.length = int(length.group(1))
+        self.length_digits = length.end(1) - length.start(1)
+        self.dict_tail = pdf[length.end(1):stream_start]
+        self.stream = pdf[stream_start:stream_end]
+        self.body_tail = pdf[stream_end:xref_start]
+        self.xref = [
+            (int(offset), rest)
+            for offset, rest in re.findall(rb'(\d{10})( \d{5} [fn] \r?\n)', pdf[xref_start:startxref])
+        ]
+        self.xref_header = pdf[xref_start:pdf.index(b'\n', pdf.index(b'\n', xref_start) + 1) + 1]
+        # invariant=1 fixes the file /ID, so each render writes its own.
+        trailer = pdf[pdf.index(b'trailer', xref_start):startxref]
+        file_id = re.compile(rb'\[<[0-9a-f]+><[0-9a-f]+>\]').search(trailer)
+        self.trailer_head = trailer[:file_id.start()]
+        self.trailer_tail = trailer[file_id.end():]
+        self.xref_offset = xref_start
+
+    def render(self, name, score, completed_on):
+        """Stamp the per-candidate fields and return the certificate as PDF bytes."""
+        try:
+            fields = {
+                'name': escape_pdf_text(name),
+                'score': escape_pdf_text(score),
+                'date': escape_pdf_text(completed_on),
+            }
+        except UnicodeEncodeError:
+            # Characters outside WinAnsi need ReportLab's full text handling.
+            return render_certificate_pdf(name, self.exam_title, score, completed_on)
+
+        stream = self.stream
+        for field, placeholder in PLACEHOLDERS.items():
+            stream = stream.replace(placeholder, fields[field])
+        length = str(self.length + len(stream) - len(self.stream)).encode()
+        delta = (len(length) - self.length_digits) + (len(stream) - len(self.stream))
+
+        xref = b''.join(
+            b'%010d%s' % (offset + delta if offset > self.length_pos else offset, rest)
+            for offset, rest in self.xref
+        )
+        file_id = hashlib.md5(stream, usedforsecurity=False).hexdigest().encode()
+        return b''.join([
+            self.head, length, self.dict_tail, stream, self.body_tail,
+            self.xref_header, xref,
+            self.trailer_head, b'[<%s><%s>]' % (file_id, file_id), self.trailer_tail,
+            b'startxref\n%d\n%%%%EOF\n' % (self.xref_offset + delta),
+        ])
+
+
+@lru_cache(maxsize=128)
+def get_template(exam_title):
+    return CertificateTemplate(exam_title)
+
+
+def write_certificate(result):
+    """Render the certificate for a result and save it to media storage."""
+    name = result.candidate.get_full_name()
+    template = get_template(result.exam.title)
+    pdf = template.render(
+        name, result.score, result.completed_at.strftime('%B %d, %Y')
+    )
+    file_name = f"{name}_{result.exam.title}_{timezone.now().strftime('%Y%m%d')}.pdf"
+    return content_storage.save(f"certificates/{file_name}", ContentFile(pdf))
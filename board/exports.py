@@ -0,0 +1,71 @@
+import csv
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Output column -> Result lookup
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'candidate_id': 'candidate_id',
+    'username': 'candidate__user__username',
+    'first_name': 'candidate__user__first_name',
+    'last_name': 'candidate__user__last_name',
+    'email': 'candidate__user__email',
+    'exam_id': 'exam_id',
+    'exam_title': 'exam__title',
+    'score': 'score',
+    'is_passed': 'is_passed',
+    'completed_at': 'completed_at',
+}
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the caller."""
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one tuple per result in EXPORT_COLUMNS order, newest first.
+
+    Each chunk is a separate joined query that seeks past the previous
+    chunk on the (-completed_at, -id) index. A single iterator() query
+    would not bound memory on MySQL, whose drivers load the whole result
+    set, so at most chunk_size rows are held at a time.
+    """
+    columns = list(EXPORT_COLUMNS)
+    completed_at, pk = columns.index('completed_at'), columns.index('id')
+    queryset = queryset.order_by('-completed_at', '-id').values_list(*EXPORT_COLUMNS.values())
+    page = queryset
+    while True:
+        rows = list(page[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+        page = queryset.filter(
+            Q(completed_at__lt=last[completed_at])
+            | Q(completed_at=last[completed_at], id__lt=last[pk])
+        )
+
+
+def stream_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in export_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream_jsonl(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    columns = list(EXPORT_COLUMNS)
+    encoder = DjangoJSONEncoder()
+    for row in export_rows(queryset, chunk_size):
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson'),
+}
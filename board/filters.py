@@ -1,5 +1,5 @@
-from django_filters.rest_framework import FilterSet
-from .models import Question
+from django_filters.rest_framework import FilterSet, DateTimeFilter
+from .models import Question, Result
 
 class QuestionFilter(FilterSet):
     class Meta:
@@ -8,3 +8,10 @@ class QuestionFilter(FilterSet):
             
         }
 
+class ResultExportFilter(FilterSet):
+    completed_after = DateTimeFilter(field_name='completed_at', lookup_expr='gte')
+    completed_before = DateTimeFilter(field_name='completed_at', lookup_expr='lt')
+
+    class Meta:
+        model = Result
+        fields = ['exam', 'is_passed']
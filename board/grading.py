@@ -0,0 +1,81 @@
+from .models import Question, Answer
+
+
+class AnswerKey:
+    """
+    In-memory answer key for a single exam.
+
+    Built from two queries (questions and answers) so that a whole
+    submission can be validated and scored without further database access.
+    """
+    def __init__(self, exam_id, question_marks, answer_questions, correct_answers):
+        self.exam_id = exam_id
+        # question_id -> marks
+        self.question_marks = question_marks
+        # answer_id -> question_id
+        self.answer_questions = answer_questions
+        # ids of the answers flagged as correct
+        self.correct_answers = correct_answers
+        self.total_marks = sum(question_marks.values())
+
+    @classmethod
+    def load(cls, exam_id):
+        """Load the answer key for an exam with a constant number of queries."""
+        question_marks = dict(
+            Question.objects.filter(exam_id=exam_id).values_list('id', 'marks')
+        )
+        answer_questions = {}
+        correct_answers = set()
+        rows = Answer.objects.filter(question__exam_id=exam_id).values_list(
+            'id', 'question_id', 'is_correct'
+        )
+        for answer_id, question_id, is_correct in rows:
+            answer_questions[answer_id] = question_id
+            if is_correct:
+                correct_answers.add(answer_id)
+        return cls(exam_id, question_marks, answer_questions, frozenset(correct_answers))
+
+    @property
+    def question_ids(self):
+        return self.question_marks.keys()
+
+    def validate(self, answers):
+        """
+        Return a list of error messages for a {question_id: answer_id} mapping.
+        An empty list means the submission is complete and every answer
+        belongs to its question.
+        """
+        if answers.keys() != self.question_marks.keys():
+            return ["All questions must be answered"]
+        return [
+            f"Invalid answer for question {question_id}"
+            for question_id, answer_id in answers.items()
+            if self.answer_questions.get(answer_id) != question_id
+        ]
+
+    def validate_partial(self, answers):
+        """Like validate, for a subset of the questions such as an autosave."""
+        return [
+            f"Invalid answer for question {question_id}"
+            for question_id, answer_id in answers.items()
+            if self.answer_questions.get(answer_id) != question_id
+        ]
+
+    def earned_marks(self, answers):
+        return sum(
+            self.question_marks[question_id]
+            for question_id, answer_id in answers.items()
+            if answer_id in self.correct_answers
+            and self.answer_questions.get(answer_id) == question_id
+        )
+
+    def score(self, answers):
+        """Percentage score (0-100) weighted by Question.marks."""
+        if not self.total_marks:
+            return 0
+        return round(self.earned_marks(answers) * 100 / self.total_marks)
+
+
+def normalize_answers(answers):
+    """Coerce submitted {question_id: answer_id} keys and values to ints."""
+    return {int(question_id): int(answer_id) for question_id, answer_id in answers.items()}
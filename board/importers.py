@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from django.db import connection, transaction
+from django.db.models import Max
+from .models import Exam, Question, Answer
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class RowError(Exception):
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+
+
+class QuestionBankError(Exception):
+    """The file as a whole cannot be read; rows already imported are kept."""
+
+
+def parse_csv(stream):
+    """
+    Yield (line, row) from a CSV question bank with the columns
+    text, marks, explanation, answers and correct. Answers are separated
+    by "|"; correct lists the 1-based positions of the correct answers.
+    Rows that cannot be parsed are yielded as RowError instances.
+    """
+    reader = csv.DictReader(stream)
+    for row in reader:
+        answers = [text.strip() for text in (row.get('answers') or '').split('|') if text.strip()]
+        try:
+            correct = {int(position) for position in (row.get('correct') or '').split('|') if position.strip()}
+        except ValueError:
+            yield reader.line_num, RowError(reader.line_num, "correct must list answer positions")
+            continue
+        yield reader.line_num, {
+            'text': row.get('text'),
+            'marks': row.get('marks') or 1,
+            'explanation': row.get('explanation') or '',
+            'answers': [
+                {'text': text, 'is_correct': position in correct}
+                for position, text in enumerate(answers, start=1)
+            ],
+        }
+
+
+def parse_jsonl(stream):
+    """
+    Yield (line, row) from a JSON Lines question bank, one object per line:
+    {"text": ..., "marks": ..., "explanation": ..., "answers": [{"text": ..., "is_correct": ...}]}
+    """
+    for line, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            yield line, json.loads(raw)
+        except ValueError:
+            yield line, RowError(line, "Invalid JSON")
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'jsonl': parse_jsonl,
+}
+
+
+def open_text(binary_file):
+    """Decode an uploaded or opened binary file lazily, line by line."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+def clean_row(line, row):
+    """Validate one parsed row and return (question fields, answers)."""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError(line, "Row must be an object")
+    text = row.get('text')
+    if not isinstance(text, str) or not text.strip():
+        raise RowError(line, "Question text is required")
+    text = text.strip()
+    explanation = row.get('explanation') or ''
+    if not isinstance(explanation, str):
+        raise RowError(line, "explanation must be text")
+    try:
+        marks = int(row.get('marks', 1))
+    except (TypeError, ValueError):
+        raise RowError(line, "marks must be a positive integer")
+    if marks < 1:
+        raise RowError(line, "marks must be a positive integer")
+
+    answers = row.get('answers') or []
+    if not isinstance(answers, list) or len(answers) < 2:
+        raise RowError(line, "At least two answers are required")
+    cleaned = []
+    for answer in answers:
+        answer_text = answer.get('text') if isinstance(answer, dict) else None
+        if not isinstance(answer_text, str) or not answer_text.strip():
+            raise RowError(line, "Every answer needs text")
+        cleaned.append((answer_text.strip(), bool(answer.get('is_correct'))))
+    if not any(is_correct for _, is_correct in cleaned):
+        raise RowError(line, "At least one answer must be correct")
+
+    return {'text': text, 'marks': marks, 'explanation': explanation}, cleaned
+
+
+class QuestionImporter:
+    """
+    Stream a question bank into an exam in fixed-size chunks.
+
+    Each chunk is validated, then written with two bulk_create calls inside
+    one transaction, so memory stays bounded by the chunk size. Invalid rows
+    are skipped and reported with their line numbers.
+    """
+    def __init__(self, exam, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.exam = exam
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.questions = 0
+        self.answers = 0
+        self.rejected = 0
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Import every row and return a report. Raises QuestionBankError if
+        the file cannot be decoded or parsed past some point.
+        """
+        started = time.monotonic()
+        rows = iter(rows)
+        try:
+            while True:
+                try:
+                    chunk = list(islice(rows, self.chunk_size))
+                except UnicodeDecodeError:
+                    raise QuestionBankError("The file must be UTF-8 encoded")
+                except csv.Error as error:
+                    raise QuestionBankError(f"Malformed CSV: {error}")
+                if not chunk:
+                    break
+                self._import_chunk(chunk)
+                if self.progress:
+                    self.progress(self)
+        finally:
+            if self.questions:
+                self.exam.update_total_questions()
+        elapsed = time.monotonic() - started
+        return {
+            'questions': self.questions,
+            'answers': self.answers,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.questions / elapsed, 1) if elapsed else None,
+        }
+
+    def _reject(self, error):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': error.line, 'error': error.message})
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for line, row in chunk:
+            try:
+                valid.append(clean_row(line, row))
+            except RowError as error:
+                self._reject(error)
+        if not valid:
+            return
+
+        with transaction.atomic():
+            # Serialise imports per exam so newly inserted ids can be recovered
+            # on backends where bulk_create does not return primary keys.
+            Exam.objects.select_for_update().only('id').get(pk=self.exam.pk)
+            last_id = Question.objects.filter(exam=self.exam).aggregate(Max('id'))['id__max'] or 0
+
+            questions = Question.objects.bulk_create(
+                Question(exam=self.exam, **fields) for fields, _ in valid
+            )
+            if not connection.features.can_return_rows_from_bulk_insert:
+                self._recover_ids(questions, last_id)
+
+            answers = [
+                Answer(question_id=question.id, text=text, is_correct=is_correct)
+                for question, (_, question_answers) in zip(questions, valid)
+                for text, is_correct in question_answers
+            ]
+            Answer.objects.bulk_create(answers)
+
+        self.questions += len(questions)
+        self.answers += len(answers)
+
+    def _recover_ids(self, questions, last_id):
+        """
+        Match the inserted questions to their new rows by content rather than
+        by position, since questions added to the exam outside the importer
+        can take ids in between.
+        """
+        inserted = {}
+        rows = Question.objects.filter(exam=self.exam, id__gt=last_id).order_by('id').values_list(
+            'id', 'text', 'marks', 'explanation'
+        )
+        for question_id, *key in rows:
+            inserted.setdefault(tuple(key), []).append(question_id)
+        for question in questions:
+            question.id = inserted[(question.text, question.marks, question.explanation)].pop(0)
@@ -0,0 +1,38 @@
+from celery import group
+from django.core.management.base import BaseCommand
+from board.models import Result
+from board.tasks import certificate_batches, generate_certificates
+
+
+class Command(BaseCommand):
+    help = "Regenerate missing certificates for passed results in parallel batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, help="Only backfill results for this exam id")
+        parser.add_argument('--batch-size', type=int, help="Results per rendering task")
+        parser.add_argument(
+            '--sync', action='store_true',
+            help="Render in this process instead of dispatching to Celery workers"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Result.objects.filter(is_passed=True, certificate_path='')
+        if options['exam']:
+            queryset = queryset.filter(exam_id=options['exam'])
+        result_ids = queryset.order_by('id').values_list('id', flat=True)
+        batches = list(certificate_batches(result_ids.iterator(), options['batch_size']))
+
+        if not batches:
+            self.stdout.write("No missing certificates.")
+            return
+
+        if options['sync']:
+            rendered = sum(generate_certificates(batch) for batch in batches)
+            self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} certificates."))
+            return
+
+        group(generate_certificates.s(batch) for batch in batches).apply_async()
+        total = sum(len(batch) for batch in batches)
+        self.stdout.write(self.style.SUCCESS(
+            f"Queued {total} certificates in {len(batches)} batches."
+        ))
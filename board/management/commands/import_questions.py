@@ -0,0 +1,45 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from board.importers import DEFAULT_CHUNK_SIZE, PARSERS, QuestionBankError, QuestionImporter, open_text
+from board.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or JSONL question bank into an exam."
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', dest='file_format', choices=sorted(PARSERS),
+            help="File format (defaults to the file extension)"
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(pk=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} does not exist")
+
+        file_format = options['file_format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in PARSERS:
+            raise CommandError(f"Unsupported format '{file_format}'")
+
+        def progress(importer):
+            self.stdout.write(f"  {importer.questions} questions imported, {importer.rejected} rejected")
+
+        importer = QuestionImporter(exam, chunk_size=options['chunk_size'], progress=progress)
+        with open(options['path'], 'rb') as handle:
+            try:
+                report = importer.run(PARSERS[file_format](open_text(handle)))
+            except QuestionBankError as error:
+                raise CommandError(f"{error} ({importer.questions} questions imported before the error)")
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['questions']} questions and {report['answers']} answers "
+            f"({report['rejected']} rejected) in {report['seconds']}s "
+            f"({report['rows_per_second']} rows/s)."
+        ))
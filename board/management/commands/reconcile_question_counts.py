@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+from board.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Repair drift between Exam.total_questions and the actual number of questions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report drifted exams without updating them"
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Exam.objects.annotate(actual=Count('questions'))
+            .exclude(total_questions=F('actual'))
+            .order_by('id')
+        )
+        repaired = 0
+        for exam in drifted:
+            self.stdout.write(
+                f"Exam {exam.id} ({exam.title}): stored {exam.total_questions}, actual {exam.actual}"
+            )
+            if not options['dry_run']:
+                exam.update_total_questions()
+                repaired += 1
+
+        if options['dry_run']:
+            self.stdout.write("Dry run, no exams updated.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} exams."))
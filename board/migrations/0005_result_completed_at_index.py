@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0004_alter_answer_options_alter_candidate_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['-completed_at', '-id'], name='board_resul_complet_1d3476_idx'),
+        ),
+    ]
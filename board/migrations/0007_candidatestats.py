@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0006_examstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateStats',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('modified_at', models.DateTimeField(auto_now=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('passes', models.PositiveIntegerField(default=0)),
+                ('score_total', models.PositiveBigIntegerField(default=0)),
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='board.candidate')),
+                ('average_score', models.FloatField(blank=True, null=True)),
+                ('last_completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'candidate stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', '-score', 'completed_at'], name='board_resul_exam_id_e436bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidatestats',
+            index=models.Index(fields=['-average_score', 'candidate'], name='board_candi_average_e5ad36_idx'),
+        ),
+    ]
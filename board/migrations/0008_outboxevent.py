@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0007_candidatestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('modified_at', models.DateTimeField(auto_now=True, null=True)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('kind', models.CharField(max_length=50)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_events', to='board.result')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processed_at', 'id'], name='board_outbo_process_54d2b0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0008_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateimage',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, upload_to='store/images/variants/%Y/%m'),
+        ),
+        migrations.AddField(
+            model_name='candidateimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='store/images/variants/%Y/%m'),
+        ),
+    ]
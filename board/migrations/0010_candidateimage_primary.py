@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:05
+
+from django.db import migrations, models
+
+
+def keep_latest_primary(apps, schema_editor):
+    """Demote all but the newest primary image of each candidate."""
+    CandidateImage = apps.get_model('board', 'CandidateImage')
+    seen = set()
+    demote = []
+    primaries = CandidateImage.objects.filter(is_primary=True).order_by(
+        'candidate_id', '-created_at', '-id'
+    ).values_list('id', 'candidate_id')
+    for image_id, candidate_id in primaries.iterator():
+        if candidate_id in seen:
+            demote.append(image_id)
+        seen.add(candidate_id)
+    CandidateImage.objects.filter(id__in=demote).update(is_primary=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0009_candidateimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidateimage',
+            index=models.Index(fields=['candidate', '-is_primary', '-created_at'], name='board_candi_candida_0983ca_idx'),
+        ),
+        migrations.RunPython(keep_latest_primary, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='candidateimage',
+            constraint=models.UniqueConstraint(models.Case(models.When(is_primary=True, then=models.F('candidate'))), name='board_candidateimage_one_primary'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:07
+
+import board.storage
+import board.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0010_candidateimage_primary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidateimage',
+            name='image',
+            field=models.ImageField(storage=board.storage.content_addressed_storage, upload_to='store/images/%Y/%m', validators=[board.validators.vaidate_file_size]),
+        ),
+        migrations.AlterField(
+            model_name='candidateimage',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, storage=board.storage.content_addressed_storage, upload_to='store/images/variants/%Y/%m'),
+        ),
+        migrations.AlterField(
+            model_name='candidateimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, storage=board.storage.content_addressed_storage, upload_to='store/images/variants/%Y/%m'),
+        ),
+    ]
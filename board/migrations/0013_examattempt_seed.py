@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:14
+
+import secrets
+
+import board.models
+from django.db import migrations, models
+
+
+def reseed_attempts(apps, schema_editor):
+    """The added column gets one default for every row; give each attempt its own seed."""
+    ExamAttempt = apps.get_model('board', 'ExamAttempt')
+    for attempt_id in ExamAttempt.objects.values_list('id', flat=True).iterator():
+        ExamAttempt.objects.filter(pk=attempt_id).update(seed=secrets.randbits(31))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0012_examattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='seed',
+            field=models.PositiveIntegerField(default=board.models.attempt_seed, editable=False),
+        ),
+        migrations.RunPython(reseed_attempts, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,19 @@
-from django.db import models
+import hashlib
+import os
+import secrets
+from datetime import timedelta
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from django.utils.dateparse import parse_datetime
 from django.contrib import admin
 from board.validators import vaidate_file_size
+from board.certificates import write_certificate
+from board.answer_buffer import get_answer_buffer
+from board.storage import content_addressed_storage
+from board.uploads import render_variant
 
 class TimeStampedModel(models.Model):
     """
@@ -60,12 +67,83 @@ class CandidateImage(TimeStampedModel):
     )
     image = models.ImageField(
         upload_to='store/images/%Y/%m',
+        storage=content_addressed_storage,
         validators=[vaidate_file_size]
     )
+    thumbnail = models.ImageField(
+        upload_to='store/images/variants/%Y/%m',
+        storage=content_addressed_storage,
+        blank=True,
+        editable=False
+    )
+    preview = models.ImageField(
+        upload_to='store/images/variants/%Y/%m',
+        storage=content_addressed_storage,
+        blank=True,
+        editable=False
+    )
     is_primary = models.BooleanField(default=False)
 
     class Meta:
         ordering = ['-is_primary', '-created_at']
+        indexes = [
+            models.Index(fields=['candidate', '-is_primary', '-created_at']),
+        ]
+        constraints = [
+            # One primary image per candidate. Written as a unique expression
+            # (NULL for non-primary rows) because MySQL ignores conditional
+            # unique constraints but enforces functional unique indexes.
+            models.UniqueConstraint(
+                models.Case(models.When(is_primary=True, then=models.F('candidate'))),
+                name='board_candidateimage_one_primary',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk and self.image.name != CandidateImage.objects.filter(
+            pk=self.pk
+        ).values_list('image', flat=True).first():
+            # A replaced original invalidates its variants.
+            self.thumbnail = self.preview = ''
+        with transaction.atomic():
+            if self.is_primary:
+                self._clear_primary()
+            super().save(*args, **kwargs)
+        if self.image and not self.thumbnail:
+            from board.tasks import queue_image_variants
+            queue_image_variants(self.pk)
+
+    def _clear_primary(self):
+        # Lock the candidate so concurrent primary changes queue up.
+        Candidate.objects.select_for_update().only('id').get(pk=self.candidate_id)
+        CandidateImage.objects.filter(
+            candidate_id=self.candidate_id, is_primary=True
+        ).exclude(pk=self.pk).update(is_primary=False)
+
+    def set_primary(self):
+        """Make this the candidate's only primary image."""
+        with transaction.atomic():
+            self._clear_primary()
+            CandidateImage.objects.filter(pk=self.pk).update(is_primary=True)
+        self.is_primary = True
+
+    def generate_variants(self):
+        """Render the WebP variants in background workers, never in the request."""
+        config = getattr(settings, 'CANDIDATE_IMAGE_UPLOAD', {})
+        base = os.path.splitext(os.path.basename(self.image.name))[0]
+        names = {}
+        for field, size in (('thumbnail', config.get('THUMBNAIL_SIZE', 128)),
+                            ('preview', config.get('PREVIEW_SIZE', 512))):
+            self.image.open('rb')
+            try:
+                variant = render_variant(self.image, size)
+            finally:
+                self.image.close()
+            getattr(self, field).save(f'{base}-{size}.webp', variant, save=False)
+            names[field] = getattr(self, field).name
+        # Skip the write if the original was replaced while rendering.
+        CandidateImage.objects.filter(pk=self.pk, image=self.image.name).update(**names)
+        return names
 
 class Exam(TimeStampedModel):
     """
@@ -89,9 +167,72 @@ class Exam(TimeStampedModel):
     def __str__(self):
         return self.title
     
+    @property
+    def content_version(self):
+        """Cache version; changes whenever the exam or its questions/answers change."""
+        if self.modified_at is None:
+            return 0
+        return int(self.modified_at.timestamp() * 1000000)
+
+    @classmethod
+    def touch(cls, **lookup):
+        """Bump modified_at (and so content_version) without a full save."""
+        return cls.objects.filter(**lookup).update(modified_at=timezone.now())
+
+    @classmethod
+    def adjust_total_questions(cls, exam_id, delta):
+        """Atomically shift total_questions by delta and bump the content version."""
+        exams = cls.objects.filter(pk=exam_id)
+        if delta < 0:
+            exams = exams.filter(total_questions__gte=-delta)
+        updated = exams.update(
+            total_questions=models.F('total_questions') + delta,
+            modified_at=timezone.now()
+        )
+        if not updated:
+            cls.touch(pk=exam_id)
+
     def update_total_questions(self):
+        """Recount questions and store the result (bulk imports, drift repair)."""
         self.total_questions = self.questions.count()
-        self.save()
+        Exam.objects.filter(pk=self.pk).update(
+            total_questions=self.total_questions,
+            modified_at=timezone.now()
+        )
+
+class ExamContentQuerySet(models.QuerySet):
+    """
+    Queryset for exam content. update() sends no signals, so it bumps the
+    content version of the affected exams itself.
+    """
+    exam_field = None
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            exam_ids = set(self.order_by().values_list(self.exam_field, flat=True))
+            updated = super().update(**kwargs)
+            if exam_ids:
+                Exam.touch(pk__in=exam_ids)
+        return updated
+
+class QuestionQuerySet(ExamContentQuerySet):
+    exam_field = 'exam_id'
+
+    def update(self, **kwargs):
+        if 'exam' not in kwargs and 'exam_id' not in kwargs:
+            return super().update(**kwargs)
+        # Moving questions changes the counts of both the old and new exams.
+        with transaction.atomic():
+            exam_ids = set(self.order_by().values_list('exam_id', flat=True))
+            updated = super().update(**kwargs)
+            exam = kwargs.get('exam', kwargs.get('exam_id'))
+            exam_ids.add(getattr(exam, 'pk', exam))
+            for exam in Exam.objects.filter(pk__in=exam_ids):
+                exam.update_total_questions()
+        return updated
+
+class AnswerQuerySet(ExamContentQuerySet):
+    exam_field = 'question__exam_id'
 
 class Question(TimeStampedModel):
     """
@@ -106,15 +247,21 @@ class Question(TimeStampedModel):
     marks = models.PositiveIntegerField(default=1)
     explanation = models.TextField(blank=True)
 
+    objects = QuestionQuerySet.as_manager()
+
     class Meta:
         ordering = ['created_at']
 
     def __str__(self):
         return self.text
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.exam.update_total_questions()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a save that moves the question can fix both exams' counts.
+        if 'exam_id' in field_names:
+            instance.saved_exam_id = instance.exam_id
+        return instance
 
 class Answer(TimeStampedModel):
     """
@@ -128,6 +275,8 @@ class Answer(TimeStampedModel):
     text = models.TextField()
     is_correct = models.BooleanField(default=False)
 
+    objects = AnswerQuerySet.as_manager()
+
     class Meta:
         ordering = ['created_at']
 
@@ -161,27 +310,578 @@ class Result(TimeStampedModel):
         indexes = [
             models.Index(fields=['candidate', 'exam']),
             models.Index(fields=['is_passed', '-completed_at']),
+            models.Index(fields=['-completed_at', '-id']),
+            models.Index(fields=['exam', '-score', 'completed_at']),
         ]
 
     def save(self, *args, **kwargs):
         self.is_passed = self.score >= self.exam.pass_mark
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = []
+            if not adding:
+                # The stored values the rollups currently count
+                previous = list(Result.objects.select_for_update().filter(pk=self.pk).only(
+                    'exam_id', 'candidate_id', 'score', 'is_passed'
+                ))
+            super().save(*args, **kwargs)
+            if adding:
+                ExamStats.record([self])
+                CandidateStats.record([self])
+                OutboxEvent.publish_results([self.pk])
+            else:
+                ExamStats.revise(previous, [self])
+                CandidateStats.revise(previous, [self])
         if self.is_passed and not self.certificate_path:
-            self.certificate_path = self.generate_certificate()
-        super().save(*args, **kwargs)
+            from board.tasks import queue_certificates
+            queue_certificates([self.pk])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            ExamStats.discard([self])
+            CandidateStats.discard([self])
+        return result
+
+    @classmethod
+    def leaderboard(cls, exam_id):
+        """Results for one exam, best first; earlier finishers win ties."""
+        return cls.objects.filter(exam_id=exam_id).order_by('-score', 'completed_at', 'id')
+
+    def rank(self):
+        """1-based position in the exam's leaderboard ordering."""
+        ahead = Result.objects.filter(exam_id=self.exam_id).filter(
+            models.Q(score__gt=self.score) |
+            models.Q(score=self.score, completed_at__lt=self.completed_at) |
+            models.Q(score=self.score, completed_at=self.completed_at, id__lt=self.id)
+        ).count()
+        return ahead + 1
+
+    @property
+    def certificate_status(self):
+        if not self.is_passed:
+            return 'not_eligible'
+        return 'ready' if self.certificate_path else 'pending'
 
     def generate_certificate(self):
         """Generate PDF certificate for passed exams"""
-        file_name = f"{self.candidate.get_full_name()}_{self.exam.title}_{timezone.now().strftime('%Y%m%d')}.pdf"
-        file_path = f"certificates/{file_name}"
-        full_path = f"media/{file_path}"
-        
-        c = canvas.Canvas(full_path, pagesize=A4)
-        c.drawString(100, 750, "Certificate of Completion")
-        c.drawString(100, 700, 
-            f"This certifies that {self.candidate.get_full_name()} "
-            f"has passed the {self.exam.title} exam with {self.score}%.")
-        c.drawString(100, 650, 
-            f"Completed on: {self.completed_at.strftime('%B %d, %Y')}")
-        c.save()
-        
-        return file_path
\ No newline at end of file
+        return write_certificate(self)
+
+class ResultRollup(TimeStampedModel):
+    """
+    Abstract rollup of Result rows grouped by one foreign key. Subclasses
+    are maintained incrementally on Result writes and can be rebuilt from
+    the Result table to repair drift.
+    """
+    group_field = None
+
+    attempts = models.PositiveIntegerField(default=0)
+    passes = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def pass_rate(self):
+        return self.passes * 100 / self.attempts if self.attempts else None
+
+    @classmethod
+    def group_key(cls):
+        return f'{cls.group_field}_id'
+
+    @classmethod
+    def aggregates(cls):
+        return {
+            'attempts': models.Count('id'),
+            'passes': models.Count('id', filter=models.Q(is_passed=True)),
+            'score_total': models.Sum('score'),
+        }
+
+    @classmethod
+    def refresh_derived(cls, keys):
+        """Hook to recompute columns derived from the counters."""
+
+    @classmethod
+    def _totals(cls, results):
+        totals = {}
+        for result in results:
+            key = getattr(result, cls.group_key())
+            attempts, passes, score_total = totals.get(key, (0, 0, 0))
+            totals[key] = (
+                attempts + 1, passes + int(result.is_passed), score_total + result.score
+            )
+        return totals
+
+    @classmethod
+    def _add(cls, field, delta):
+        """F(field) + delta, floored at zero so the unsigned counters never underflow."""
+        if delta >= 0:
+            return models.F(field) + delta
+        return models.Case(
+            models.When(**{f'{field}__gte': -delta}, then=models.F(field) + delta),
+            default=models.Value(0),
+            output_field=cls._meta.get_field(field),
+        )
+
+    @classmethod
+    def _apply(cls, key, attempts, passes, score_total):
+        lookup = {cls.group_key(): key}
+        changes = {
+            'attempts': cls._add('attempts', attempts),
+            'passes': cls._add('passes', passes),
+            'score_total': cls._add('score_total', score_total),
+            'modified_at': timezone.now(),
+        }
+        if cls.objects.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    attempts=max(attempts, 0),
+                    passes=max(passes, 0),
+                    score_total=max(score_total, 0),
+                    **lookup
+                )
+        except IntegrityError:
+            # Another writer created the row first.
+            cls.objects.filter(**lookup).update(**changes)
+
+    @classmethod
+    def record(cls, results):
+        """Add newly created results to their rollups."""
+        totals = cls._totals(results)
+        for key, values in totals.items():
+            cls._apply(key, *values)
+        cls.refresh_derived(totals.keys())
+
+    @classmethod
+    def discard(cls, results):
+        """Remove deleted results from their rollups."""
+        totals = cls._totals(results)
+        for key, values in totals.items():
+            cls._apply(key, *(-value for value in values))
+        cls.refresh_derived(totals.keys())
+
+    @classmethod
+    def revise(cls, old, new):
+        """
+        Move updated results from their previous values to their current
+        ones by applying the difference, including a result that moved to
+        another group.
+        """
+        totals = cls._totals(new)
+        for key, values in cls._totals(old).items():
+            current = totals.get(key, (0, 0, 0))
+            totals[key] = tuple(now - before for now, before in zip(current, values))
+        for key, values in totals.items():
+            if any(values):
+                cls._apply(key, *values)
+        cls.refresh_derived(totals.keys())
+
+    @classmethod
+    def rebuild(cls, keys=None):
+        """
+        Recompute rollups from the Result table. Returns how many rows were
+        corrected. Rollup rows are locked first, so concurrent increments
+        queue behind the rebuild and are applied on top of it.
+        """
+        group_key = cls.group_key()
+        fields = list(cls.aggregates())
+        with transaction.atomic():
+            existing = cls.objects.select_for_update()
+            results = Result.objects.all()
+            if keys is not None:
+                existing = existing.filter(**{f'{group_key}__in': keys})
+                results = results.filter(**{f'{group_key}__in': keys})
+            existing = {getattr(rollup, group_key): rollup for rollup in existing}
+            actual = {
+                row[group_key]: row
+                for row in results.order_by().values(group_key).annotate(**cls.aggregates())
+            }
+
+            created, changed = [], []
+            for key in actual.keys() | existing.keys():
+                row = actual.get(key, {})
+                values = {field: row.get(field) for field in fields}
+                for field in ('attempts', 'passes', 'score_total'):
+                    values[field] = values[field] or 0
+                rollup = existing.get(key)
+                if rollup is None:
+                    created.append(cls(**{group_key: key}, **values))
+                elif any(getattr(rollup, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(rollup, field, value)
+                    rollup.modified_at = timezone.now()
+                    changed.append(rollup)
+
+            cls.objects.bulk_create(created)
+            cls.objects.bulk_update(changed, fields + ['modified_at'])
+            cls.refresh_derived([getattr(rollup, group_key) for rollup in created + changed])
+        return len(created) + len(changed)
+
+
+class ExamStats(ResultRollup):
+    """
+    Per-exam rollup of results, so reads never aggregate the Result table.
+    """
+    group_field = 'exam'
+
+    exam = models.OneToOneField(
+        Exam,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+
+    class Meta:
+        verbose_name_plural = 'exam stats'
+
+    def __str__(self):
+        return f'Stats for {self.exam_id}'
+
+    @property
+    def average_score(self):
+        return self.score_total / self.attempts if self.attempts else None
+
+
+class CandidateStats(ResultRollup):
+    """
+    Per-candidate rollup of results. average_score is stored and indexed
+    so the overall leaderboard and a candidate's rank come from the index.
+    """
+    group_field = 'candidate'
+
+    candidate = models.OneToOneField(
+        Candidate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    average_score = models.FloatField(null=True, blank=True)
+    last_completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'candidate stats'
+        indexes = [
+            models.Index(fields=['-average_score', 'candidate']),
+        ]
+
+    def __str__(self):
+        return f'Stats for {self.candidate_id}'
+
+    @classmethod
+    def aggregates(cls):
+        aggregates = super().aggregates()
+        aggregates['last_completed_at'] = models.Max('completed_at')
+        return aggregates
+
+    @classmethod
+    def refresh_derived(cls, keys):
+        keys = list(keys)
+        if not keys:
+            return
+        last_completed = Result.objects.filter(
+            candidate_id=models.OuterRef('candidate_id')
+        ).order_by('-completed_at').values('completed_at')[:1]
+        cls.objects.filter(candidate_id__in=keys).update(
+            average_score=models.Case(
+                models.When(attempts__gt=0, then=models.F('score_total') * 1.0 / models.F('attempts')),
+                default=None,
+                output_field=models.FloatField(),
+            ),
+            last_completed_at=models.Subquery(last_completed),
+        )
+
+    @classmethod
+    def leaderboard(cls):
+        return cls.objects.filter(average_score__isnull=False).order_by('-average_score', 'candidate_id')
+
+    def rank(self):
+        """1-based position in the overall leaderboard ordering."""
+        if self.average_score is None:
+            return None
+        ahead = CandidateStats.objects.filter(
+            models.Q(average_score__gt=self.average_score) |
+            models.Q(average_score=self.average_score, candidate_id__lt=self.candidate_id)
+        ).count()
+        return ahead + 1
+
+
+class OutboxEvent(TimeStampedModel):
+    """
+    Transactional outbox: events are written in the same transaction as
+    the rows they describe and drained by board.tasks.drain_outbox. The
+    unique key makes publishing idempotent.
+    """
+    RESULT_PUBLISHED = 'result.published'
+
+    key = models.CharField(max_length=100, unique=True)
+    kind = models.CharField(max_length=50)
+    result = models.ForeignKey(
+        Result,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_events'
+    )
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'id']),
+        ]
+
+    def __str__(self):
+        return self.key
+
+    @classmethod
+    def publish_results(cls, result_ids):
+        """
+        Record a result.published event per result and kick the drain on
+        commit. The kick is best effort: if the broker is down the error is
+        logged rather than failing the submission, and the scheduled drain
+        picks the events up.
+        """
+        events = [
+            cls(key=f'{cls.RESULT_PUBLISHED}:{result_id}', kind=cls.RESULT_PUBLISHED, result_id=result_id)
+            for result_id in result_ids
+        ]
+        if not events:
+            return
+        cls.objects.bulk_create(events, ignore_conflicts=True)
+        from board.tasks import drain_outbox
+        transaction.on_commit(drain_outbox.delay, robust=True)
+
+
+def attempt_seed():
+    return secrets.randbits(31)
+
+
+def shuffle_key(seed, item):
+    """
+    Sort key for item in the order seeded by seed. It is a keyed hash of
+    the item alone, so adding items never moves the others.
+    """
+    return hashlib.blake2b(str(item).encode(), key=seed.to_bytes(4, 'big'), digest_size=8).digest()
+
+
+def shuffle_questions(questions, seed, started_at=None):
+    """
+    Serialized questions and their answers in the order seeded by seed.
+    Questions created after started_at sort after the rest, so a question
+    added mid-attempt is appended instead of reshuffling the paper. Answers
+    are submitted by id and need no mapping back. The input is not modified.
+    """
+    def added_late(question):
+        created_at = question.get('created_at')
+        if isinstance(created_at, str):
+            created_at = parse_datetime(created_at)
+        return bool(started_at and created_at and created_at > started_at)
+
+    questions = sorted(
+        questions, key=lambda question: (added_late(question), shuffle_key(seed, question['id']))
+    )
+    return [
+        {**question, 'answers': sorted(
+            question['answers'], key=lambda answer: shuffle_key(seed, f"answer:{answer['id']}")
+        )}
+        for question in questions
+    ]
+
+
+class AttemptClosed(Exception):
+    """Raised when answers are saved to an attempt that is finished or out of time."""
+
+
+class ExamAttempt(TimeStampedModel):
+    """
+    A timed sitting of an exam. Answers are saved incrementally into a
+    compact {question_id: answer_id} map; finalising grades that map and
+    records the Result. The deadline is enforced on the server.
+    """
+    IN_PROGRESS = 'in_progress'
+    SUBMITTED = 'submitted'
+    EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (IN_PROGRESS, 'In progress'),
+        (SUBMITTED, 'Submitted'),
+        (EXPIRED, 'Expired'),
+    ]
+
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='attempts'
+    )
+    exam = models.ForeignKey(
+        Exam,
+        on_delete=models.CASCADE,
+        related_name='attempts'
+    )
+    started_at = models.DateTimeField(default=timezone.now)
+    deadline = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=IN_PROGRESS)
+    answers = models.JSONField(default=dict, blank=True)
+    # Seeds the attempt's question and answer order, see shuffle()
+    seed = models.PositiveIntegerField(default=attempt_seed, editable=False)
+    result = models.OneToOneField(
+        Result,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attempt'
+    )
+
+    class Meta:
+        ordering = ['-started_at']
+        unique_together = ['candidate', 'exam']
+        indexes = [
+            models.Index(fields=['status', 'deadline']),
+        ]
+
+    def __str__(self):
+        return f'{self.candidate_id} - {self.exam_id} ({self.status})'
+
+    @classmethod
+    def grace(cls):
+        """Allowance for network latency on saves that race the deadline."""
+        return timedelta(seconds=getattr(settings, 'EXAM_ATTEMPT_GRACE_SECONDS', 5))
+
+    @classmethod
+    def start(cls, candidate_id, exam):
+        """Start an attempt, or return the candidate's existing one. Returns (attempt, created)."""
+        now = timezone.now()
+        return cls.objects.get_or_create(
+            candidate_id=candidate_id,
+            exam=exam,
+            defaults={'started_at': now, 'deadline': now + exam.duration}
+        )
+
+    @property
+    def remaining_seconds(self):
+        if self.status != self.IN_PROGRESS:
+            return 0
+        return max(0, int((self.deadline - timezone.now()).total_seconds()))
+
+    def is_open(self, now=None):
+        now = now or timezone.now()
+        return self.status == self.IN_PROGRESS and now <= self.deadline + self.grace()
+
+    def save_answers(self, answers):
+        """
+        Merge {question_id: answer_id} pairs into the attempt; None clears a
+        question. With an answer buffer the pairs reach the answers column
+        on the next flush, otherwise the row is updated under a lock.
+        Returns the answers as they will be once flushed.
+        """
+        if not self.is_open():
+            raise AttemptClosed("This attempt is closed")
+        answer_buffer = get_answer_buffer()
+        if answer_buffer is not None:
+            return self.merge_answers(self.answers, answer_buffer.save(self.pk, answers))
+        with transaction.atomic():
+            attempt = ExamAttempt.objects.select_for_update().get(pk=self.pk)
+            if not attempt.is_open():
+                raise AttemptClosed("This attempt is closed")
+            attempt.answers = self.merge_answers(attempt.answers, answers)
+            attempt.save(update_fields=['answers', 'modified_at'])
+        self.answers = attempt.answers
+        return attempt.answers
+
+    def shuffle(self, questions):
+        """
+        The serialized question tree in this attempt's order, rebuilt from
+        self.seed on every read.
+        """
+        return shuffle_questions(questions, self.seed, self.started_at)
+
+    @staticmethod
+    def merge_answers(saved, pending):
+        merged = dict(saved)
+        for question_id, answer_id in pending.items():
+            if answer_id is None:
+                merged.pop(str(question_id), None)
+            else:
+                merged[str(question_id)] = answer_id
+        return merged
+
+    def current_answers(self):
+        """Saved answers with any still waiting in the answer buffer applied."""
+        answer_buffer = get_answer_buffer()
+        if answer_buffer is None or self.status != self.IN_PROGRESS:
+            return self.answers
+        return self.merge_answers(self.answers, answer_buffer.pending(self.pk))
+
+    @classmethod
+    def flush_buffered(cls, attempt_ids=None, batch_size=None):
+        """
+        Write buffered answers to the database, one transaction per batch of
+        attempts. Buffer entries are only dropped after the batch commits.
+        Answers for attempts that are no longer in progress are discarded.
+        """
+        answer_buffer = get_answer_buffer()
+        if answer_buffer is None:
+            return 0
+        if attempt_ids is None:
+            attempt_ids = answer_buffer.attempt_ids()
+        attempt_ids = sorted(attempt_ids)
+        batch_size = batch_size or getattr(settings, 'ANSWER_BUFFER', {}).get('FLUSH_BATCH_SIZE', 500)
+        flushed = 0
+        for start in range(0, len(attempt_ids), batch_size):
+            pending = {
+                attempt_id: answer_buffer.take(attempt_id)
+                for attempt_id in attempt_ids[start:start + batch_size]
+            }
+            changed = [attempt_id for attempt_id, answers in pending.items() if answers]
+            with transaction.atomic():
+                attempts = list(
+                    cls.objects.select_for_update()
+                    .filter(pk__in=changed, status=cls.IN_PROGRESS)
+                    .only('id', 'answers', 'modified_at')
+                )
+                now = timezone.now()
+                for attempt in attempts:
+                    attempt.answers = cls.merge_answers(attempt.answers, pending[attempt.pk])
+                    attempt.modified_at = now
+                cls.objects.bulk_update(attempts, ['answers', 'modified_at'])
+            for attempt_id, answers in pending.items():
+                answer_buffer.ack(attempt_id, answers)
+            flushed += len(attempts)
+        return flushed
+
+    def finalize(self, answer_key):
+        """
+        Grade the saved answers and record the Result. Unanswered questions
+        earn no marks. Safe to call more than once. If the candidate already
+        has a Result for the exam, the attempt is closed with that Result.
+        """
+        ExamAttempt.flush_buffered([self.pk])
+        with transaction.atomic():
+            attempt = ExamAttempt.objects.select_for_update().get(pk=self.pk)
+            if attempt.status != self.IN_PROGRESS:
+                return attempt.result
+            now = timezone.now()
+            score = answer_key.score(
+                {int(question_id): answer_id for question_id, answer_id in attempt.answers.items()}
+            )
+            try:
+                with transaction.atomic():
+                    attempt.result = Result.objects.create(
+                        candidate_id=attempt.candidate_id,
+                        exam=self.exam,
+                        score=score,
+                        is_passed=score >= self.exam.pass_mark,
+                        completed_at=min(now, attempt.deadline)
+                    )
+            except IntegrityError:
+                # Already submitted through the one-shot endpoint.
+                attempt.result = Result.objects.get(
+                    candidate_id=attempt.candidate_id, exam_id=attempt.exam_id
+                )
+            attempt.status = self.SUBMITTED if now <= attempt.deadline + self.grace() else self.EXPIRED
+            attempt.finished_at = now
+            attempt.save(update_fields=['result', 'status', 'finished_at', 'modified_at'])
+        self.result, self.status, self.finished_at = attempt.result, attempt.status, attempt.finished_at
+        return attempt.result
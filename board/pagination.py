@@ -1,4 +1,43 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 
 class DefaultPagination(PageNumberPagination):
-    page_size = 10
\ No newline at end of file
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on an indexed column, so deep pages cost
+    the same as the first one instead of an OFFSET scan.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class ResultKeysetPagination(KeysetPagination):
+    ordering = ('-completed_at', '-id')
+
+class ExamKeysetPagination(KeysetPagination):
+    # created_at is nullable and the cursor seeks on the first field only;
+    # ids follow creation order and are never null.
+    ordering = ('-id',)
+
+class KeysetPaginationMixin:
+    """
+    Use page-number pagination by default and switch to the view's
+    keyset_pagination_class when the client asks for ?paginate=cursor
+    or follows a ?cursor= link.
+    """
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if self.keyset_pagination_class and (
+                'cursor' in params or params.get('paginate') == 'cursor'
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from accounts.authentication import get_principal
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -29,17 +30,17 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     Custom permission to only allow owners of an object or admins to access it.
     """
     def has_object_permission(self, request, view, obj):
+        principal = get_principal(request)
         # Admin users can access any object
-        if request.user.is_staff and not request.user.is_candidate:
+        if principal.is_admin:
             return True
             
-        # Check if the object has a user attribute
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        # Check if the object belongs to a user
+        if hasattr(obj, 'user_id'):
+            return obj.user_id == principal.user_id
             
-        # Check if the object has a candidate attribute
-        if hasattr(obj, 'candidate'):
-            return obj.candidate.user == request.user
+        # Check if the object belongs to a candidate
+        if hasattr(obj, 'candidate_id'):
+            return principal.candidate_id is not None and obj.candidate_id == principal.candidate_id
             
         return False
-        
\ No newline at end of file
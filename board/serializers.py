@@ -1,8 +1,15 @@
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 from djoser.serializers import UserSerializer as BaseUserSerializer
+from django.utils.duration import duration_string
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from board.models import Candidate, Exam, Question, Answer, Result, CandidateImage
+from board.models import (
+    Candidate, CandidateStats, Exam, ExamAttempt, ExamStats, Question, Answer, Result,
+    CandidateImage)
+from accounts.authentication import get_principal
+from board.cache import get_exam_structure
+from board.grading import AnswerKey, normalize_answers
 
 User = get_user_model()
 
@@ -30,18 +37,30 @@ class CandidateSerializer(serializers.ModelSerializer):
 class CandidateImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = CandidateImage
-        fields = ['id', 'candidate', 'image', 'is_primary']
+        fields = ['id', 'candidate', 'image', 'thumbnail', 'preview', 'is_primary']
+        read_only_fields = ['candidate']
+
+def get_audience(request):
+    """'staff' (admins) sees is_correct on answers, 'candidate' does not."""
+    return 'staff' if request and get_principal(request).is_admin else 'candidate'
 
 class AnswerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Answer
         fields = ['id', 'text', 'is_correct']
 
+    @cached_property
+    def show_correct(self):
+        """Decided once per serializer tree rather than once per answer."""
+        if 'show_correct' in self.context:
+            return self.context['show_correct']
+        request = self.context.get('request')
+        return not request or get_principal(request).is_admin
+
     def to_representation(self, instance):
         """Hide is_correct field from non-staff users"""
         ret = super().to_representation(instance)
-        request = self.context.get('request')
-        if request and not request.user.is_staff:
+        if not self.show_correct:
             ret.pop('is_correct', None)
         return ret
 
@@ -69,13 +88,30 @@ class QuestionSerializer(serializers.ModelSerializer):
             representation.pop('answers', None)
         return representation
 
+def build_questions(exam, audience):
+    """Serialize the question tree with a fixed number of queries."""
+    questions = Question.objects.filter(exam=exam).prefetch_related('answers')
+    return list(QuestionSerializer(
+        questions, many=True, context={'show_correct': audience == 'staff'}
+    ).data)
+
+def exam_questions(exam, audience):
+    """Serialized question tree for an audience, served from the exam cache."""
+    return get_exam_structure(exam, lambda: build_questions(exam, audience), audience)
+
 class ExamSerializer(serializers.ModelSerializer):
-    questions = QuestionSerializer(many=True, read_only=True)
+    questions = serializers.SerializerMethodField()
 
     class Meta:
         model = Exam
         fields = ['id', 'title', 'duration', 'pass_mark', 'is_active', 'questions']
 
+    def get_questions(self, instance):
+        """Question tree for detail views, served from the exam cache."""
+        if not self.context.get('detail', False):
+            return None
+        return exam_questions(instance, get_audience(self.context.get('request')))
+
     def to_representation(self, instance):
         """Show questions only in detail view"""
         ret = super().to_representation(instance)
@@ -83,6 +119,38 @@ class ExamSerializer(serializers.ModelSerializer):
             ret.pop('questions', None)
         return ret
 
+class ExamStatsSerializer(serializers.ModelSerializer):
+    pass_rate = serializers.FloatField(read_only=True)
+    average_score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ExamStats
+        fields = ['exam', 'attempts', 'passes', 'pass_rate', 'average_score', 'modified_at']
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(source='position', read_only=True)
+    candidate_name = serializers.SerializerMethodField()
+    pass_rate = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CandidateStats
+        fields = ['rank', 'candidate', 'candidate_name', 'attempts', 'passes',
+                  'pass_rate', 'average_score', 'last_completed_at']
+
+    def get_candidate_name(self, obj):
+        return f"{obj.candidate.user.first_name} {obj.candidate.user.last_name}"
+
+class ExamLeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(source='position', read_only=True)
+    candidate_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Result
+        fields = ['rank', 'candidate', 'candidate_name', 'score', 'is_passed', 'completed_at']
+
+    def get_candidate_name(self, obj):
+        return f"{obj.candidate.user.first_name} {obj.candidate.user.last_name}"
+
 class ExamSubmissionSerializer(serializers.Serializer):
     answers = serializers.DictField(
         child=serializers.IntegerField(),
@@ -90,25 +158,86 @@ class ExamSubmissionSerializer(serializers.Serializer):
     )
 
     def validate_answers(self, value):
-        exam_id = self.context.get('exam_id')
-        if not exam_id:
-            raise serializers.ValidationError("Exam ID is required")
-
-        questions = Question.objects.filter(exam_id=exam_id)
-        question_ids = set(questions.values_list('id', flat=True))
-        submitted_ids = set(int(k) for k in value.keys())
-
-        if submitted_ids != question_ids:
-            raise serializers.ValidationError("All questions must be answered")
-
-        for question_id, answer_id in value.items():
-            if not Answer.objects.filter(
-                question_id=question_id, 
-                id=answer_id
-            ).exists():
-                raise serializers.ValidationError(
-                    f"Invalid answer for question {question_id}"
-                )
+        answer_key = self.context.get('answer_key')
+        if answer_key is None:
+            exam_id = self.context.get('exam_id')
+            if not exam_id:
+                raise serializers.ValidationError("Exam ID is required")
+            answer_key = AnswerKey.load(exam_id)
+
+        try:
+            value = normalize_answers(value)
+        except ValueError:
+            raise serializers.ValidationError("Question IDs must be integers")
+
+        errors = answer_key.validate(value)
+        if errors:
+            raise serializers.ValidationError(errors[0])
+        return value
+
+class BulkSubmissionEntrySerializer(serializers.Serializer):
+    candidate = serializers.IntegerField()
+    answers = serializers.DictField(
+        child=serializers.IntegerField(),
+        help_text="Dictionary of question_id: answer_id pairs"
+    )
+    completed_at = serializers.DateTimeField(required=False)
+
+class BulkExamSubmissionSerializer(serializers.Serializer):
+    """
+    Many candidates' answer sets for one exam. Only the shape is validated
+    here; answers are checked per row against the exam's answer key.
+    """
+    submissions = BulkSubmissionEntrySerializer(many=True, allow_empty=False, max_length=1000)
+
+class ExamAttemptSerializer(serializers.ModelSerializer):
+    remaining_seconds = serializers.IntegerField(read_only=True)
+    answers = serializers.JSONField(source='current_answers', read_only=True)
+
+    class Meta:
+        model = ExamAttempt
+        fields = ['id', 'exam', 'started_at', 'deadline', 'remaining_seconds',
+                  'status', 'answers', 'result']
+        read_only_fields = fields
+
+class AttemptPaperSerializer(serializers.ModelSerializer):
+    """The attempt's exam questions in the attempt's own order."""
+    remaining_seconds = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(source='exam.title', read_only=True)
+    questions = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExamAttempt
+        fields = ['id', 'exam', 'title', 'deadline', 'remaining_seconds', 'questions']
+        read_only_fields = fields
+
+    def get_questions(self, attempt):
+        return attempt.shuffle(
+            exam_questions(attempt.exam, get_audience(self.context.get('request')))
+        )
+
+class AttemptAnswersSerializer(serializers.Serializer):
+    answers = serializers.DictField(
+        child=serializers.IntegerField(allow_null=True),
+        allow_empty=False,
+        help_text="Dictionary of question_id: answer_id pairs; null clears an answer"
+    )
+
+    def validate_answers(self, value):
+        try:
+            value = {int(question_id): answer_id for question_id, answer_id in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Question IDs must be integers")
+
+        answer_key = self.context['answer_key']
+        unknown = [question_id for question_id in value if question_id not in answer_key.question_marks]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown question {unknown[0]}")
+        errors = answer_key.validate_partial(
+            {question_id: answer_id for question_id, answer_id in value.items() if answer_id is not None}
+        )
+        if errors:
+            raise serializers.ValidationError(errors[0])
         return value
 
 class ResultSerializer(serializers.ModelSerializer):
@@ -122,4 +251,70 @@ class ResultSerializer(serializers.ModelSerializer):
         read_only_fields = ['score', 'is_passed']
 
     def get_candidate_name(self, obj):
-        return f"{obj.candidate.user.first_name} {obj.candidate.user.last_name}"
\ No newline at end of file
+        return f"{obj.candidate.user.first_name} {obj.candidate.user.last_name}"
+
+class ValuesSerializer:
+    """
+    Read-only serializer over values() rows for hot list endpoints. It
+    produces the same JSON as its ModelSerializer counterpart without
+    building model instances or running DRF fields per row.
+    """
+    columns = ()
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls.columns)
+
+    @classmethod
+    def to_representation(cls, row):
+        """Rows are served as they are; subclasses rename and format columns."""
+        return dict(row)
+
+    @classmethod
+    def serialize(cls, rows):
+        return [cls.to_representation(row) for row in rows]
+
+class CandidateValuesSerializer(ValuesSerializer):
+    """Same shape as CandidateSerializer."""
+    columns = ('id', 'user_id', 'user__first_name', 'user__last_name', 'phone')
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            'id': row['id'],
+            'user': row['user_id'],
+            'first_name': row['user__first_name'],
+            'last_name': row['user__last_name'],
+            'phone': row['phone'],
+        }
+
+class ExamValuesSerializer(ValuesSerializer):
+    """Same shape as ExamSerializer in list views."""
+    columns = ('id', 'title', 'duration', 'pass_mark', 'is_active', 'created_at')
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'duration': duration_string(row['duration']),
+            'pass_mark': row['pass_mark'],
+            'is_active': row['is_active'],
+        }
+
+class ResultValuesSerializer(ValuesSerializer):
+    """Same shape as ResultSerializer."""
+    columns = ('id', 'candidate_id', 'candidate__user__first_name', 'candidate__user__last_name',
+               'exam_id', 'exam__title', 'score', 'is_passed', 'completed_at')
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            'id': row['id'],
+            'candidate': row['candidate_id'],
+            'candidate_name': f"{row['candidate__user__first_name']} {row['candidate__user__last_name']}",
+            'exam': row['exam_id'],
+            'exam_title': row['exam__title'],
+            'score': row['score'],
+            'is_passed': row['is_passed'],
+        }
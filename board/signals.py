@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Answer, Exam, Question
+
+# Exam.content_version keys the exam caches. These receivers bump it for
+# every save and delete of a question or answer, including queryset and
+# cascade deletes; queryset updates are covered by ExamContentQuerySet.
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, **kwargs):
+    previous_exam_id = getattr(instance, 'saved_exam_id', None)
+    if created:
+        Exam.adjust_total_questions(instance.exam_id, 1)
+    elif previous_exam_id is not None and previous_exam_id != instance.exam_id:
+        Exam.adjust_total_questions(previous_exam_id, -1)
+        Exam.adjust_total_questions(instance.exam_id, 1)
+    else:
+        Exam.adjust_total_questions(instance.exam_id, 0)
+    instance.saved_exam_id = instance.exam_id
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, **kwargs):
+    Exam.adjust_total_questions(instance.exam_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    Exam.touch(questions__id=instance.question_id)
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CAS_PREFIX = 'cas'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after the SHA-256 of their content,
+    as cas/<2 hex>/<digest><ext>. Uploads are hashed while being streamed to
+    a temporary file, and identical content is stored once.
+
+    Files share the MEDIA_ROOT location so names saved by the previous
+    storage keep resolving. Because a stored file may be referenced by many
+    rows, delete() leaves content in place.
+    """
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save().
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        directory = self.path(CAS_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hex_digest = digest.hexdigest()
+            name = f'{CAS_PREFIX}/{hex_digest[:2]}/{hex_digest}{extension}'
+            if self.exists(name):
+                return name
+            os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+            os.replace(temp_path, self.path(name))
+            if self.file_permissions_mode is not None:
+                os.chmod(self.path(name), self.file_permissions_mode)
+            return name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def delete(self, name):
+        pass
+
+
+content_storage = ContentAddressedStorage()
+
+
+def content_addressed_storage():
+    """Storage callable for model fields, so migrations do not capture settings."""
+    return content_storage
+
+
+def is_content_addressed(name):
+    return name.startswith(f'{CAS_PREFIX}/')
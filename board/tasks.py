@@ -0,0 +1,153 @@
+import logging
+from celery import shared_task, group
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from core.notifications import notify
+from .cache import get_answer_key
+from .models import CandidateImage, CandidateStats, ExamAttempt, ExamStats, OutboxEvent, Result
+
+logger = logging.getLogger(__name__)
+
+
+def certificate_batches(result_ids, batch_size=None):
+    batch_size = batch_size or settings.CERTIFICATE_BATCH_SIZE
+    result_ids = list(result_ids)
+    for start in range(0, len(result_ids), batch_size):
+        yield result_ids[start:start + batch_size]
+
+
+@shared_task
+def generate_certificates(result_ids):
+    """Render certificates for a batch of passed results and store their paths."""
+    results = list(
+        Result.objects.filter(id__in=result_ids, is_passed=True, certificate_path='')
+        .select_related('candidate__user', 'exam')
+    )
+    rendered = []
+    for result in results:
+        try:
+            result.certificate_path = result.generate_certificate()
+        except Exception:
+            logger.exception("Certificate generation failed for result %s", result.pk)
+            continue
+        rendered.append(result)
+    Result.objects.bulk_update(rendered, ['certificate_path'])
+    return len(rendered)
+
+
+def queue_certificates(result_ids, batch_size=None):
+    """
+    Fan certificate rendering out to the worker pool in batches once the
+    current transaction commits. A broker error is logged rather than
+    raised, as the result is already saved; backfill_certificates renders
+    whatever was missed.
+    """
+    batches = list(certificate_batches(result_ids, batch_size))
+    if not batches:
+        return
+    transaction.on_commit(
+        lambda: group(generate_certificates.s(batch) for batch in batches).apply_async(),
+        robust=True
+    )
+
+
+@shared_task
+def generate_image_variants(image_id):
+    """Render the resized WebP variants of an uploaded candidate image."""
+    image = CandidateImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return None
+    try:
+        return image.generate_variants()
+    except Exception:
+        logger.exception("Variant generation failed for candidate image %s", image_id)
+        return None
+
+
+def queue_image_variants(image_id):
+    transaction.on_commit(lambda: generate_image_variants.delay(image_id))
+
+
+@shared_task
+def reconcile_exam_stats():
+    """Repair drift in the per-exam and per-candidate result rollups."""
+    return ExamStats.rebuild() + CandidateStats.rebuild()
+
+
+def notify_published_results(results):
+    """
+    Send one notification per exam and outcome rather than one per result,
+    so a cohort's results go out as a few batched sends.
+    """
+    groups = {}
+    for result in results:
+        email = result.candidate.user.email
+        if email:
+            groups.setdefault((result.exam, result.is_passed), []).append(email)
+    for (exam, is_passed), recipients in groups.items():
+        if is_passed:
+            subject = f"You passed {exam.title}"
+            body = (
+                f"Congratulations! You passed {exam.title}. "
+                "Your certificate will be available from your results page."
+            )
+        else:
+            subject = f"Your {exam.title} result is available"
+            body = f"Your result for {exam.title} has been published. Log in to view your score."
+        notify(recipients, subject, body)
+
+
+@shared_task
+def drain_outbox(batch_size=None):
+    """
+    Process pending outbox events in batches. Each batch is locked with
+    SKIP LOCKED and marked processed in the same transaction that records
+    its notifications, so concurrent drains never send an event twice.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    drained = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True)
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+            result_ids = [
+                event.result_id for event in events if event.kind == OutboxEvent.RESULT_PUBLISHED
+            ]
+            notify_published_results(
+                Result.objects.filter(id__in=result_ids).select_related('candidate__user', 'exam')
+            )
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+                processed_at=timezone.now()
+            )
+        drained += len(events)
+    return drained
+
+
+@shared_task
+def flush_answer_buffer():
+    """Write autosaved answers waiting in the answer buffer to the database."""
+    return ExamAttempt.flush_buffered()
+
+
+@shared_task
+def finalize_expired_attempts(batch_size=500):
+    """Grade attempts whose deadline (plus grace) passed without a finalize."""
+    expired = ExamAttempt.objects.filter(
+        status=ExamAttempt.IN_PROGRESS,
+        deadline__lt=timezone.now() - ExamAttempt.grace()
+    ).select_related('exam').order_by('deadline')[:batch_size]
+    finalized = 0
+    for attempt in expired:
+        try:
+            attempt.finalize(get_answer_key(attempt.exam))
+        except Exception:
+            logger.exception("Finalizing expired attempt %s failed", attempt.pk)
+            continue
+        finalized += 1
+    return finalized
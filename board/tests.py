@@ -1,3 +1,1044 @@
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory
+from accounts.authentication import get_principal
+from accounts.models import User
+from board.answer_buffer import RedisAnswerBuffer
+from board.certificates import CertificateTemplate, render_certificate_pdf
+from board.exports import export_rows
+from board.grading import AnswerKey
+from board.importers import QuestionImporter
+from board.models import Answer, Candidate, CandidateImage, Exam, ExamAttempt, ExamStats, OutboxEvent, Question, Result
+from board.permissions import IsOwnerOrAdmin
+from board.storage import content_storage
+from board.tasks import drain_outbox, finalize_expired_attempts, generate_certificates
+from board.views import ExamViewSet
 
-# Create your tests here.
+TEST_REDIS_URL = os.getenv('TEST_REDIS_URL')
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+
+def make_exam(questions=4, title='Exam', pass_mark=50):
+    """An exam whose question i is worth i + 1 marks, with one right and one wrong answer."""
+    exam = Exam.objects.create(title=title, duration=timedelta(minutes=30), pass_mark=pass_mark)
+    for i in range(questions):
+        question = Question.objects.create(exam=exam, text=f'Question {i}', marks=i + 1)
+        Answer.objects.create(question=question, text='Right', is_correct=True)
+        Answer.objects.create(question=question, text='Wrong')
+    return exam
+
+
+def make_candidate(number):
+    user = User.objects.create(
+        username=f'candidate{number}', email=f'candidate{number}@example.com',
+        first_name='Candidate', last_name=str(number), phone_number=f'0700{number}',
+        is_candidate=True
+    )
+    return Candidate.objects.create(user=user, phone=f'0700{number}')
+
+
+def make_admin():
+    return User.objects.create(
+        username='admin', email='admin@example.com', phone_number='0600',
+        is_staff=True, is_superuser=True
+    )
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def correct_answers(exam):
+    return {
+        str(question.id): question.answers.get(is_correct=True).id
+        for question in exam.questions.all()
+    }
+
+
+class AnswerBufferTests(TestCase):
+    """Without Redis, autosaves are written straight to the attempt row."""
+    def setUp(self):
+        self.exam = make_exam()
+        self.candidate = make_candidate(1)
+        self.attempt, _ = ExamAttempt.start(self.candidate.pk, self.exam)
+
+    def test_save_without_redis_writes_database(self):
+        question_id, answer_id = next(iter(correct_answers(self.exam).items()))
+        with self.settings(ANSWER_BUFFER={}):
+            self.attempt.save_answers({int(question_id): answer_id})
+            self.assertEqual(ExamAttempt.flush_buffered(), 0)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.answers, {question_id: answer_id})
+
+
+@skipUnless(TEST_REDIS_URL, 'TEST_REDIS_URL is not set')
+class RedisAnswerBufferTests(TestCase):
+    def setUp(self):
+        self.buffer = RedisAnswerBuffer(TEST_REDIS_URL, prefix='test:board:answers')
+        self.addCleanup(self.clear_keys)
+        self.clear_keys()
+        patcher = mock.patch('board.models.get_answer_buffer', return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.exam = make_exam()
+        self.answers = correct_answers(self.exam)
+        self.attempt, _ = ExamAttempt.start(make_candidate(1).pk, self.exam)
+
+    def clear_keys(self):
+        keys = list(self.buffer.client.scan_iter(f'{self.buffer.prefix}:*'))
+        if keys:
+            self.buffer.client.delete(*keys)
+
+    def test_repeated_saves_coalesce(self):
+        self.buffer.save(self.attempt.pk, {1: 10, 2: 20})
+        self.buffer.save(self.attempt.pk, {1: 11, 2: None})
+        self.assertEqual(self.buffer.pending(self.attempt.pk), {1: 11, 2: None})
+        self.assertEqual(self.buffer.attempt_ids(), {self.attempt.pk})
+
+    def test_ack_keeps_values_saved_after_take(self):
+        self.buffer.save(self.attempt.pk, {1: 10})
+        taken = self.buffer.take(self.attempt.pk)
+        self.buffer.save(self.attempt.pk, {1: 11})
+        # A concurrent flush merges the newer value into the flushing hash.
+        self.buffer.take(self.attempt.pk)
+        self.buffer.ack(self.attempt.pk, taken)
+        self.assertEqual(self.buffer.pending(self.attempt.pk), {1: 11})
+        self.assertEqual(self.buffer.attempt_ids(), {self.attempt.pk})
+
+    def test_ack_clears_flushed_attempt(self):
+        self.buffer.save(self.attempt.pk, {1: 10})
+        self.buffer.ack(self.attempt.pk, self.buffer.take(self.attempt.pk))
+        self.assertEqual(self.buffer.pending(self.attempt.pk), {})
+        self.assertEqual(self.buffer.attempt_ids(), set())
+
+    def test_failed_flush_is_recovered(self):
+        self.buffer.save(self.attempt.pk, {1: 10, 2: 20})
+        self.buffer.take(self.attempt.pk)  # flush died before acking
+        self.buffer.save(self.attempt.pk, {2: 21})
+        self.assertEqual(self.buffer.attempt_ids(), {self.attempt.pk})
+        self.assertEqual(self.buffer.take(self.attempt.pk), {1: 10, 2: 21})
+
+    def test_flush_writes_buffered_answers(self):
+        question_ids = list(self.answers)
+        self.attempt.save_answers({int(question_ids[0]): self.answers[question_ids[0]]})
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.answers, {})
+        self.assertEqual(len(self.attempt.current_answers()), 1)
+
+        self.assertEqual(ExamAttempt.flush_buffered(), 1)
+        self.attempt.refresh_from_db()
+        self.assertEqual(self.attempt.answers, {question_ids[0]: self.answers[question_ids[0]]})
+        self.assertEqual(self.buffer.attempt_ids(), set())
+
+    def test_finalize_flushes_first(self):
+        self.attempt.save_answers({int(question_id): answer_id for question_id, answer_id in self.answers.items()})
+        result = self.attempt.finalize(AnswerKey.load(self.exam.pk))
+        self.assertEqual(result.score, 100)
+        self.assertEqual(self.buffer.attempt_ids(), set())
+
+
+class ExamAttemptTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam()
+        self.answers = correct_answers(self.exam)
+        self.candidate = make_candidate(1)
+        self.client = api_client(self.candidate.user)
+
+    def start(self):
+        response = self.client.post(f'/api/exams/{self.exam.pk}/start/')
+        self.assertIn(response.status_code, (200, 201))
+        return response.json()['id']
+
+    def save(self, attempt_id, answers):
+        return self.client.patch(
+            f'/api/attempts/{attempt_id}/answers/', {'answers': answers}, format='json'
+        )
+
+    def test_start_resumes_attempt_in_progress(self):
+        response = self.client.post(f'/api/exams/{self.exam.pk}/start/')
+        self.assertEqual(response.status_code, 201)
+        resumed = self.client.post(f'/api/exams/{self.exam.pk}/start/')
+        self.assertEqual(resumed.status_code, 200)
+        self.assertEqual(resumed.json()['id'], response.json()['id'])
+
+    def test_save_merges_and_clears_answers(self):
+        attempt_id = self.start()
+        first, second = list(self.answers)[:2]
+        self.save(attempt_id, {first: self.answers[first], second: self.answers[second]})
+        response = self.save(attempt_id, {second: None})
+        self.assertEqual(response.json()['answered'], 1)
+        self.assertEqual(
+            ExamAttempt.objects.get(pk=attempt_id).answers, {first: self.answers[first]}
+        )
+
+    def test_save_rejects_unknown_question(self):
+        attempt_id = self.start()
+        response = self.save(attempt_id, {'999999': 1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_candidates_cannot_save(self):
+        attempt_id = self.start()
+        other = api_client(make_candidate(2).user)
+        response = other.patch(
+            f'/api/attempts/{attempt_id}/answers/', {'answers': self.answers}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_save_after_deadline_is_rejected(self):
+        attempt_id = self.start()
+        ExamAttempt.objects.filter(pk=attempt_id).update(
+            deadline=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(self.save(attempt_id, self.answers).status_code, 409)
+
+    def test_finalize_grades_once(self):
+        attempt_id = self.start()
+        self.save(attempt_id, self.answers)
+        response = self.client.post(f'/api/attempts/{attempt_id}/finalize/')
+        self.assertEqual(response.json()['score'], 100)
+        again = self.client.post(f'/api/attempts/{attempt_id}/finalize/')
+        self.assertEqual(again.json()['id'], response.json()['id'])
+        self.assertEqual(Result.objects.filter(candidate=self.candidate).count(), 1)
+        self.assertEqual(self.save(attempt_id, self.answers).status_code, 409)
+
+    def test_submit_rejected_while_attempt_in_progress(self):
+        self.start()
+        response = self.client.post(
+            f'/api/exams/{self.exam.pk}/submit/', {'answers': self.answers}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Result.objects.exists())
+
+    def test_finalize_closes_attempt_with_existing_result(self):
+        attempt_id = self.start()
+        existing = Result.objects.create(candidate=self.candidate, exam=self.exam, score=40)
+        attempt = ExamAttempt.objects.get(pk=attempt_id)
+        self.assertEqual(attempt.finalize(AnswerKey.load(self.exam.pk)), existing)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, ExamAttempt.SUBMITTED)
+        self.assertEqual(attempt.result, existing)
+
+    def test_sweep_finalizes_expired_attempts(self):
+        attempt_id = self.start()
+        self.save(attempt_id, self.answers)
+        ExamAttempt.objects.filter(pk=attempt_id).update(
+            deadline=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertEqual(finalize_expired_attempts(), 1)
+        attempt = ExamAttempt.objects.select_related('result').get(pk=attempt_id)
+        self.assertEqual(attempt.status, ExamAttempt.EXPIRED)
+        self.assertEqual(attempt.result.score, 100)
+        self.assertEqual(finalize_expired_attempts(), 0)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam()
+        self.first, self.second = make_candidate(1), make_candidate(2)
+        Result.objects.create(candidate=self.first, exam=self.exam, score=60)
+        Result.objects.create(candidate=self.second, exam=self.exam, score=90)
+
+    def test_full_leaderboards_are_admin_only(self):
+        client = api_client(self.first.user)
+        self.assertEqual(client.get(f'/api/exams/{self.exam.pk}/leaderboard/').status_code, 403)
+        self.assertEqual(client.get('/api/leaderboard/').status_code, 403)
+
+    def test_admin_sees_ranked_results(self):
+        response = api_client(make_admin()).get(f'/api/exams/{self.exam.pk}/leaderboard/')
+        self.assertEqual(
+            [(entry['rank'], entry['candidate']) for entry in response.json()['results']],
+            [(1, self.second.pk), (2, self.first.pk)]
+        )
+
+    def test_candidate_sees_own_rank(self):
+        client = api_client(self.first.user)
+        response = client.get(f'/api/exams/{self.exam.pk}/leaderboard/rank/')
+        self.assertEqual(response.json()['rank'], 2)
+        self.assertEqual(client.get('/api/leaderboard/rank/').json()['rank'], 2)
+
+    def test_staff_candidate_cannot_rank_others(self):
+        User.objects.filter(pk=self.first.user_id).update(is_staff=True)
+        client = api_client(User.objects.get(pk=self.first.user_id))
+        response = client.get(
+            f'/api/exams/{self.exam.pk}/leaderboard/rank/', {'candidate': self.second.pk}
+        )
+        self.assertEqual(response.json()['rank'], 2)
+
+
+class OwnershipTests(TestCase):
+    def setUp(self):
+        self.owner, self.other = make_candidate(1), make_candidate(2)
+        self.result = Result.objects.create(candidate=self.owner, exam=make_exam(1), score=60)
+
+    def allowed(self, user, obj):
+        request = APIRequestFactory().get('/')
+        request.user = user
+        get_principal(request)
+        with self.assertNumQueries(0):
+            return IsOwnerOrAdmin().has_object_permission(request, None, obj)
+
+    def test_owner_matches_by_id(self):
+        self.assertTrue(self.allowed(self.owner.user, self.result))
+        self.assertTrue(self.allowed(self.owner.user, self.owner))
+        self.assertFalse(self.allowed(self.other.user, self.result))
+        self.assertFalse(self.allowed(self.other.user, self.owner))
+
+    def test_admin_may_access_anything(self):
+        self.assertTrue(self.allowed(make_admin(), self.result))
+
+    def test_staff_flag_does_not_make_a_candidate_admin(self):
+        self.other.user.is_staff = True
+        self.assertFalse(self.allowed(self.other.user, self.result))
+
+    def test_users_without_a_candidate_own_no_candidate_rows(self):
+        user = User.objects.create(username='plain', email='plain@example.com', phone_number='0500')
+        self.assertFalse(self.allowed(user, self.result))
+
+    def test_staff_candidate_cannot_add_images_for_others(self):
+        User.objects.filter(pk=self.other.user_id).update(is_staff=True)
+        client = api_client(User.objects.get(pk=self.other.user_id))
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+        upload = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            response = client.post(
+                f'/api/candidates/{self.owner.pk}/images/', {'image': upload}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.owner.images.exists())
+
+
+class ContentFileTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = make_candidate(1)
+        result = Result.objects.create(candidate=self.owner, exam=make_exam(1), score=0)
+        self.name = content_storage.save('certificates/cert.pdf', ContentFile(b'%PDF-1.4 test'))
+        Result.objects.filter(pk=result.pk).update(certificate_path=self.name)
+        self.url = content_storage.url(self.name)
+
+    def test_owner_and_admin_can_download(self):
+        for user in (self.owner.user, make_admin()):
+            response = api_client(user).get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 test')
+
+    def test_responses_are_private_and_revalidate_by_hash(self):
+        client = api_client(self.owner.user)
+        response = client.get(self.url)
+        self.assertTrue(response['Cache-Control'].startswith('private,'))
+        cached = client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_other_users_cannot_download(self):
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+        self.assertEqual(api_client(make_candidate(2).user).get(self.url).status_code, 404)
+
+
+class CertificateTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.exam = make_exam(1, title='Maths')
+        self.candidate = make_candidate(1)
+        self.passed = Result.objects.create(candidate=self.candidate, exam=self.exam, score=80)
+        self.second = Result.objects.create(candidate=make_candidate(2), exam=self.exam, score=90)
+        self.failed = Result.objects.create(candidate=make_candidate(3), exam=self.exam, score=20)
+
+    def paths(self):
+        return dict(Result.objects.values_list('id', 'certificate_path'))
+
+    def test_generate_fills_paths_for_passed_results(self):
+        ids = [self.passed.pk, self.second.pk, self.failed.pk]
+        self.assertEqual(generate_certificates(ids), 2)
+        paths = self.paths()
+        self.assertTrue(content_storage.exists(paths[self.passed.pk]))
+        self.assertTrue(content_storage.exists(paths[self.second.pk]))
+        self.assertEqual(paths[self.failed.pk], '')
+
+    def test_generate_skips_failed_renders(self):
+        def write(result):
+            if result.pk == self.passed.pk:
+                raise RuntimeError('render failed')
+            return 'certificates/ok.pdf'
+
+        with mock.patch('board.models.write_certificate', side_effect=write), \
+                self.assertLogs('board.tasks', 'ERROR'):
+            self.assertEqual(generate_certificates([self.passed.pk, self.second.pk]), 1)
+        paths = self.paths()
+        self.assertEqual(paths[self.passed.pk], '')
+        self.assertEqual(paths[self.second.pk], 'certificates/ok.pdf')
+
+    def test_broker_outage_does_not_fail_save(self):
+        with mock.patch('board.tasks.group', side_effect=OSError('Connection refused')), \
+                self.assertLogs(level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                result = Result.objects.create(
+                    candidate=make_candidate(4), exam=self.exam, score=70
+                )
+        self.assertTrue(Result.objects.filter(pk=result.pk).exists())
+
+    def test_backfill_sync_renders_missing(self):
+        Result.objects.filter(pk=self.second.pk).update(certificate_path='certificates/done.pdf')
+        out = io.StringIO()
+        call_command('backfill_certificates', '--sync', '--batch-size', '1', stdout=out)
+        self.assertIn('Rendered 1 certificates.', out.getvalue())
+        paths = self.paths()
+        self.assertTrue(paths[self.passed.pk])
+        self.assertEqual(paths[self.second.pk], 'certificates/done.pdf')
+        self.assertEqual(paths[self.failed.pk], '')
+
+        out = io.StringIO()
+        call_command('backfill_certificates', '--sync', stdout=out)
+        self.assertIn('No missing certificates.', out.getvalue())
+
+    def test_status_endpoint(self):
+        client = api_client(self.candidate.user)
+        url = f'/api/results/{self.passed.pk}/certificate/'
+        self.assertEqual(client.get(url).json()['status'], 'pending')
+
+        generate_certificates([self.passed.pk])
+        data = client.get(url).json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertTrue(data['certificate_url'])
+
+        failed = api_client(self.failed.candidate.user).get(
+            f'/api/results/{self.failed.pk}/certificate/'
+        )
+        self.assertEqual(failed.json(), {
+            'id': self.failed.pk, 'status': 'not_eligible', 'certificate_url': None
+        })
+        other = api_client(self.failed.candidate.user).get(url)
+        self.assertEqual(other.status_code, 404)
+
+
+@skipUnless(PdfReader, 'pypdf is not installed')
+class CertificateTemplateTests(TestCase):
+    title = 'Maths (Advanced)'
+    date = 'May 01, 2026'
+
+    def assertValidXref(self, pdf):
+        startxref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        self.assertTrue(pdf[startxref:].startswith(b'xref'))
+        entries = re.findall(rb'(\d{10}) \d{5} n', pdf[startxref:])
+        for number, offset in enumerate(entries, start=1):
+            self.assertTrue(pdf[int(offset):].startswith(b'%d 0 obj' % number))
+
+    def test_stamped_text_matches_full_render(self):
+        template = CertificateTemplate(self.title)
+        for name in ['Ann (Lee)', 'Back\\slash', 'a) b( c\\', 'Zoë Ndiaye']:
+            pdf = template.render(name, 80, self.date)
+            reader = PdfReader(io.BytesIO(pdf), strict=True)
+            expected = PdfReader(io.BytesIO(
+                render_certificate_pdf(name, self.title, 80, self.date)
+            ), strict=True)
+            self.assertEqual(
+                reader.pages[0].extract_text(), expected.pages[0].extract_text()
+            )
+            self.assertIn(name, reader.pages[0].extract_text())
+            self.assertValidXref(pdf)
+
+    def test_names_outside_winansi_fall_back_to_full_render(self):
+        template = CertificateTemplate(self.title)
+        with mock.patch(
+            'board.certificates.render_certificate_pdf', wraps=render_certificate_pdf
+        ) as render:
+            pdf = template.render('Łukasz 李', 80, self.date)
+        render.assert_called_once_with('Łukasz 李', self.title, 80, self.date)
+        reader = PdfReader(io.BytesIO(pdf), strict=True)
+        self.assertIn(self.title, reader.pages[0].extract_text())
+
+    def test_each_certificate_gets_its_own_file_id(self):
+        template = CertificateTemplate(self.title)
+        first = PdfReader(io.BytesIO(template.render('Ann', 80, self.date)), strict=True)
+        second = PdfReader(io.BytesIO(template.render('Bob', 80, self.date)), strict=True)
+        self.assertNotEqual(first.trailer['/ID'][0], second.trailer['/ID'][0])
+
+
+class ExamCacheInvalidationTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(2)
+        self.client = api_client(make_candidate(1).user)
+        self.url = f'/api/exams/{self.exam.pk}/'
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertStale(self, etag):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_unchanged_exam_is_not_modified(self):
+        etag = self.etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_answer_save(self):
+        etag = self.etag()
+        answer = Answer.objects.filter(question__exam=self.exam).first()
+        answer.text = 'Changed'
+        answer.save()
+        self.assertStale(etag)
+
+    def test_queryset_update(self):
+        etag = self.etag()
+        Answer.objects.filter(question__exam=self.exam).update(text='Changed')
+        payload = self.assertStale(etag)
+        self.assertEqual(payload['questions'][0]['answers'][0]['text'], 'Changed')
+
+        etag = self.etag()
+        Question.objects.filter(exam=self.exam).update(text='Changed')
+        self.assertEqual(self.assertStale(etag)['questions'][0]['text'], 'Changed')
+
+    def test_queryset_delete(self):
+        etag = self.etag()
+        Question.objects.filter(exam=self.exam).first().answers.all().delete()
+        self.assertStale(etag)
+
+        etag = self.etag()
+        Question.objects.filter(exam=self.exam).delete()
+        self.assertEqual(self.assertStale(etag)['questions'], [])
+        self.exam.refresh_from_db()
+        self.assertEqual(self.exam.total_questions, 0)
+
+
+class TotalQuestionsTests(TestCase):
+    def setUp(self):
+        self.source, self.target = make_exam(2, 'Source'), make_exam(1, 'Target')
+
+    def assertTotals(self, source, target):
+        self.source.refresh_from_db()
+        self.target.refresh_from_db()
+        self.assertEqual((self.source.total_questions, self.target.total_questions), (source, target))
+
+    def test_counts_follow_creates_and_deletes(self):
+        self.assertTotals(2, 1)
+        self.source.questions.first().delete()
+        self.assertTotals(1, 1)
+
+    def test_moving_a_question_adjusts_both_exams(self):
+        question = Question.objects.filter(exam=self.source).first()
+        question.exam = self.target
+        question.save()
+        self.assertTotals(1, 2)
+        question.save()
+        self.assertTotals(1, 2)
+
+    def test_moving_questions_with_update_adjusts_both_exams(self):
+        Question.objects.filter(exam=self.source).update(exam=self.target)
+        self.assertTotals(0, 3)
+
+
+class QuestionImportTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(0)
+        self.client = api_client(make_admin())
+
+    def upload(self, name, content):
+        return self.client.post(
+            f'/api/exams/{self.exam.pk}/import-questions/',
+            {'file': SimpleUploadedFile(name, content)}, format='multipart'
+        )
+
+    def test_imports_valid_rows_and_reports_invalid_ones(self):
+        rows = [
+            {'text': 'Valid', 'answers': [{'text': 'A', 'is_correct': True}, {'text': 'B'}]},
+            {'text': 5, 'answers': [{'text': 'A', 'is_correct': True}, {'text': 'B'}]},
+            {'text': 'Numeric answer', 'answers': [{'text': 1, 'is_correct': True}, {'text': 'B'}]},
+            {'text': 'No correct answer', 'answers': [{'text': 'A'}, {'text': 'B'}]},
+        ]
+        response = self.upload('bank.jsonl', '\n'.join(json.dumps(row) for row in rows).encode())
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['questions'], report['answers'], report['rejected']), (1, 2, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3, 4])
+        self.exam.refresh_from_db()
+        self.assertEqual(self.exam.total_questions, 1)
+
+    def test_non_utf8_file_is_rejected(self):
+        content = 'text,answers,correct\nCafé au lait?,Oui|Non,1\n'.encode('latin-1')
+        response = self.upload('bank.csv', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.json()['error'])
+
+    def test_malformed_csv_is_rejected(self):
+        oversized_field = b'x' * (csv.field_size_limit() + 1)
+        response = self.upload('bank.csv', b'text,answers,correct\n' + oversized_field + b',A|B,1\n')
+        self.assertEqual(response.status_code, 400)
+
+    def test_ids_recovered_by_content_without_returning_inserts(self):
+        rows = [
+            {'text': f'Question {i}', 'marks': i, 'answers': [
+                {'text': f'Right {i}', 'is_correct': True}, {'text': f'Wrong {i}'}
+            ]}
+            for i in range(1, 4)
+        ]
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            report = QuestionImporter(self.exam).run(enumerate(rows, start=1))
+        self.assertEqual(report['questions'], 3)
+        for question in Question.objects.filter(exam=self.exam):
+            suffix = question.text.split()[-1]
+            self.assertEqual(
+                sorted(question.answers.values_list('text', flat=True)),
+                [f'Right {suffix}', f'Wrong {suffix}']
+            )
+
+
+class BulkSubmitTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam()
+        self.answers = correct_answers(self.exam)
+        self.first, self.second = make_candidate(1), make_candidate(2)
+        self.client = api_client(make_admin())
+
+    def test_outcomes_per_row(self):
+        Result.objects.create(candidate=self.second, exam=self.exam, score=10)
+        response = self.client.post(f'/api/exams/{self.exam.pk}/bulk-submit/', {'submissions': [
+            {'candidate': self.first.pk, 'answers': self.answers},
+            {'candidate': self.first.pk, 'answers': self.answers},
+            {'candidate': self.second.pk, 'answers': self.answers},
+            {'candidate': 999999, 'answers': self.answers},
+        ]}, format='json')
+        outcomes = response.json()['results']
+        self.assertEqual(
+            [outcome['status'] for outcome in outcomes], ['created', 'rejected', 'rejected', 'rejected']
+        )
+        self.assertEqual(outcomes[0]['score'], 100)
+        self.assertEqual(Result.objects.get(pk=outcomes[0]['id']).candidate, self.first)
+        self.assertEqual(self.exam.stats.attempts, 2)
+
+    def test_concurrently_inserted_result_is_reported_as_duplicate(self):
+        answer_key = AnswerKey.load(self.exam.pk)
+        score = answer_key.score
+
+        def score_after_concurrent_submit(answers):
+            # Another request records the second candidate's result after
+            # the bulk submission checked for existing results.
+            if not Result.objects.filter(candidate=self.second).exists():
+                Result.objects.create(candidate=self.second, exam=self.exam, score=10)
+            return score(answers)
+
+        answer_key.score = score_after_concurrent_submit
+        answers = {int(question_id): answer_id for question_id, answer_id in self.answers.items()}
+        outcomes = ExamViewSet()._process_bulk_submission(self.exam, [
+            {'candidate': self.first.pk, 'answers': answers},
+            {'candidate': self.second.pk, 'answers': answers},
+        ], answer_key)
+
+        self.assertEqual([outcome['status'] for outcome in outcomes], ['created', 'rejected'])
+        self.assertEqual(outcomes[1]['error'], "Candidate has already attempted this exam")
+        self.assertEqual(Result.objects.get(candidate=self.second).score, 10)
+        self.assertEqual(Result.objects.get(candidate=self.first).score, 100)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_exam_cursor_pages_cover_every_exam(self):
+        exams = [make_exam(0, title=f'Exam {i}') for i in range(5)]
+        Exam.objects.filter(pk__in=[exams[1].pk, exams[3].pk]).update(created_at=None)
+        client = api_client(make_candidate(1).user)
+
+        seen, url = [], '/api/exams/?paginate=cursor&page_size=2'
+        while url:
+            page = client.get(url).json()
+            seen += [exam['id'] for exam in page['results']]
+            url = page['next']
+        self.assertEqual(seen, sorted((exam.pk for exam in exams), reverse=True))
+
+
+class CandidateImageUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.candidate = make_candidate(1)
+        self.client = api_client(self.candidate.user)
+        self.url = f'/api/candidates/{self.candidate.pk}/images/'
+
+    def test_non_image_upload_is_rejected(self):
+        upload = SimpleUploadedFile('photo.png', b'not an image at all')
+        response = self.client.post(self.url, {'image': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+        self.assertFalse(self.candidate.images.exists())
+
+    def test_image_upload_is_stored(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+        upload = SimpleUploadedFile('photo.png', buffer.getvalue(), content_type='image/png')
+        with mock.patch('board.tasks.queue_image_variants'):
+            response = self.client.post(self.url, {'image': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.candidate.images.exists())
+
+
+class CandidatePrimaryImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.candidate = make_candidate(1)
+
+    def add_image(self, candidate, is_primary=False, color='red'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+        return CandidateImage.objects.create(
+            candidate=candidate, is_primary=is_primary,
+            image=SimpleUploadedFile(f'{color}.png', buffer.getvalue())
+        )
+
+    def primary_ids(self, candidate):
+        return list(candidate.images.filter(is_primary=True).values_list('id', flat=True))
+
+    def test_new_primary_demotes_the_old_one(self):
+        self.add_image(self.candidate, is_primary=True)
+        second = self.add_image(self.candidate, is_primary=True, color='blue')
+        self.assertEqual(self.primary_ids(self.candidate), [second.pk])
+
+    def test_constraint_rejects_a_second_primary(self):
+        self.add_image(self.candidate, is_primary=True)
+        second = self.add_image(self.candidate, color='blue')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CandidateImage.objects.filter(pk=second.pk).update(is_primary=True)
+        other = make_candidate(2)
+        self.add_image(other, is_primary=True)
+        self.assertEqual(len(self.primary_ids(other)), 1)
+
+    def test_set_primary_endpoint_is_owner_scoped(self):
+        first = self.add_image(self.candidate, is_primary=True)
+        second = self.add_image(self.candidate, color='blue')
+        url = f'/api/candidates/{self.candidate.pk}/images/{second.pk}/set-primary/'
+
+        other = api_client(make_candidate(2).user)
+        self.assertEqual(other.post(url).status_code, 404)
+        self.assertEqual(self.primary_ids(self.candidate), [first.pk])
+
+        response = api_client(self.candidate.user).post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['is_primary'])
+        self.assertEqual(self.primary_ids(self.candidate), [second.pk])
+
+    def test_primary_image_embed_is_one_query(self):
+        candidates = [self.candidate] + [make_candidate(number) for number in range(2, 6)]
+        for candidate in candidates[:3]:
+            self.add_image(candidate, is_primary=True)
+        client = api_client(make_admin())
+        # The first request resolves the admin's principal.
+        client.get('/api/candidates/')
+        with CaptureQueriesContext(connection) as plain:
+            client.get('/api/candidates/')
+        with CaptureQueriesContext(connection) as embedded:
+            response = client.get('/api/candidates/', {'include': 'primary_image'})
+        self.assertEqual(len(embedded), len(plain) + 1)
+        rows = {row['id']: row['primary_image'] for row in response.json()['results']}
+        self.assertTrue(all(rows[candidate.pk] for candidate in candidates[:3]))
+        self.assertTrue(all(rows[candidate.pk] is None for candidate in candidates[3:]))
+
+
+class ResultStatsTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(1, pass_mark=50)
+        self.candidate = make_candidate(1)
+        self.result = Result.objects.create(candidate=self.candidate, exam=self.exam, score=80)
+
+    def assertStats(self, stats, attempts, passes, score_total):
+        stats.refresh_from_db()
+        self.assertEqual(
+            (stats.attempts, stats.passes, stats.score_total), (attempts, passes, score_total)
+        )
+
+    def test_update_applies_delta_without_rebuild(self):
+        Result.objects.create(candidate=make_candidate(2), exam=self.exam, score=60)
+        self.result.score = 30
+        with mock.patch.object(ExamStats, 'rebuild') as rebuild:
+            self.result.save()
+        rebuild.assert_not_called()
+        self.assertStats(self.exam.stats, 2, 1, 90)
+        self.candidate.stats.refresh_from_db()
+        self.assertEqual(self.candidate.stats.average_score, 30)
+
+    def test_moving_result_updates_both_exams(self):
+        other = make_exam(1, title='Other')
+        self.result.exam = other
+        self.result.save()
+        self.assertStats(self.exam.stats, 0, 0, 0)
+        self.assertStats(other.stats, 1, 1, 80)
+        self.assertStats(self.candidate.stats, 1, 1, 80)
+
+    def test_counters_never_go_below_zero(self):
+        ExamStats.objects.filter(exam=self.exam).update(attempts=0, passes=0, score_total=10)
+        Result.objects.filter(pk=self.result.pk).delete()
+        ExamStats.discard([self.result])
+        self.assertStats(self.exam.stats, 0, 0, 0)
+        self.assertEqual(ExamStats.rebuild([self.exam.pk]), 0)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(1, title='Maths')
+        self.other_exam = make_exam(1, title='Physics')
+        self.candidates = [make_candidate(number) for number in range(1, 5)]
+
+    def test_publish_ignores_duplicate_keys(self):
+        result = Result.objects.create(candidate=self.candidates[0], exam=self.exam, score=40)
+        OutboxEvent.publish_results([result.pk, result.pk])
+        self.assertEqual(OutboxEvent.objects.filter(result=result).count(), 1)
+
+    def test_broker_outage_does_not_fail_submission(self):
+        with mock.patch.object(drain_outbox, 'apply_async', side_effect=OSError('Connection refused')), \
+                self.assertLogs(level='ERROR'):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                result = Result.objects.create(candidate=self.candidates[0], exam=self.exam, score=40)
+        self.assertEqual(len(callbacks), 1)
+        self.assertTrue(OutboxEvent.objects.filter(result=result).exists())
+
+    def test_drain_groups_sends_by_exam_and_outcome(self):
+        for candidate, score in zip(self.candidates, [80, 90, 30]):
+            Result.objects.create(candidate=candidate, exam=self.exam, score=score)
+        Result.objects.create(candidate=self.candidates[3], exam=self.other_exam, score=70)
+        with mock.patch('board.tasks.notify') as notify:
+            self.assertEqual(drain_outbox(batch_size=3), 4)
+        sends = sorted((call.args[1], sorted(call.args[0])) for call in notify.call_args_list)
+        self.assertEqual(sends, [
+            ('You passed Maths', ['candidate1@example.com', 'candidate2@example.com']),
+            ('You passed Physics', ['candidate4@example.com']),
+            ('Your Maths result is available', ['candidate3@example.com']),
+        ])
+        self.assertFalse(OutboxEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_drain_skips_processed_events(self):
+        Result.objects.create(candidate=self.candidates[0], exam=self.exam, score=80)
+        with mock.patch('board.tasks.notify'):
+            drain_outbox()
+        with mock.patch('board.tasks.notify') as notify:
+            self.assertEqual(drain_outbox(), 0)
+        notify.assert_not_called()
+
+
+class ResultExportTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(1, title='Maths')
+        self.other_exam = make_exam(1, title='Physics')
+        now = timezone.now()
+        self.results = []
+        for number, (exam, score, days) in enumerate(
+            [(self.exam, 80, 3), (self.exam, 20, 2), (self.exam, 90, 2), (self.other_exam, 70, 1)],
+            start=1
+        ):
+            result = Result.objects.create(
+                candidate=make_candidate(number), exam=exam, score=score,
+                completed_at=now - timedelta(days=days)
+            )
+            self.results.append(result)
+        self.client = api_client(make_admin())
+
+    def export(self, **params):
+        response = self.client.get('/api/results/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_is_newest_first(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual(
+            [int(row['id']) for row in rows],
+            [self.results[3].pk, self.results[2].pk, self.results[1].pk, self.results[0].pk]
+        )
+        self.assertEqual(rows[0]['exam_title'], 'Physics')
+        self.assertEqual(rows[0]['email'], 'candidate4@example.com')
+
+    def test_jsonl_export_applies_filters(self):
+        output = self.export(
+            file_format='jsonl', exam=self.exam.pk, is_passed='true',
+            completed_after=(timezone.now() - timedelta(days=2, hours=1)).isoformat()
+        )
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.results[2].pk])
+        self.assertEqual(rows[0]['score'], 90)
+        self.assertIs(rows[0]['is_passed'], True)
+
+    def test_rows_are_paged_by_keyset(self):
+        Result.objects.update(completed_at=timezone.now())
+        expected = sorted((result.pk for result in self.results), reverse=True)
+        with self.assertNumQueries(3):
+            rows = list(export_rows(Result.objects.all(), chunk_size=2))
+        self.assertEqual([row[0] for row in rows], expected)
+
+    def test_rejects_unknown_format_and_non_admins(self):
+        response = self.client.get('/api/results/export/', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        candidate = api_client(self.results[0].candidate.user)
+        self.assertEqual(candidate.get('/api/results/export/').status_code, 403)
+
+
+class ShuffleTests(TestCase):
+    def setUp(self):
+        self.exam = make_exam(questions=8)
+        self.candidate = make_candidate(1)
+        self.client = api_client(self.candidate.user)
+
+    def start(self, client=None):
+        response = (client or self.client).post(f'/api/exams/{self.exam.pk}/start/')
+        return ExamAttempt.objects.get(pk=response.json()['id'])
+
+    def paper(self, attempt, client=None):
+        response = (client or self.client).get(f'/api/attempts/{attempt.pk}/paper/')
+        self.assertEqual(response.status_code, 200)
+        return [question['id'] for question in response.json()['questions']]
+
+    def answer_orders(self, attempt):
+        response = self.client.get(f'/api/attempts/{attempt.pk}/paper/')
+        return {
+            question['id']: [answer['id'] for answer in question['answers']]
+            for question in response.json()['questions']
+        }
+
+    def test_order_is_derived_from_seed(self):
+        attempt = self.start()
+        order = self.paper(attempt)
+        self.assertCountEqual(order, self.exam.questions.values_list('id', flat=True))
+        self.assertEqual(self.paper(attempt), order)
+
+    def test_attempts_get_different_orders(self):
+        orders = set()
+        for number in range(2, 7):
+            client = api_client(make_candidate(number).user)
+            orders.add(tuple(self.paper(self.start(client), client)))
+        self.assertGreater(len(orders), 1)
+
+    def test_added_question_is_appended(self):
+        attempt = self.start()
+        before = self.paper(attempt)
+        answers = self.answer_orders(attempt)
+        question = Question.objects.create(exam=self.exam, text='Late', marks=1)
+        Answer.objects.create(question_id=before[0], text='Another')
+        self.assertEqual(self.paper(attempt), before + [question.pk])
+        after = self.answer_orders(attempt)
+        self.assertEqual(
+            [answer for answer in after[before[0]] if answer in answers[before[0]]],
+            answers[before[0]]
+        )
+        self.assertEqual(after[before[1]], answers[before[1]])
+
+    def test_other_candidates_cannot_read_paper(self):
+        attempt = self.start()
+        other = api_client(make_candidate(2).user)
+        response = other.get(f'/api/attempts/{attempt.pk}/paper/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_exam_detail_serves_shared_payload(self):
+        self.start()
+        first = self.client.get(f'/api/exams/{self.exam.pk}/')
+        with mock.patch('board.views.JSONRenderer.render') as render:
+            second = api_client(make_candidate(2).user).get(f'/api/exams/{self.exam.pk}/')
+        render.assert_not_called()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertTrue(all('is_correct' not in answer
+                            for question in first.json()['questions']
+                            for answer in question['answers']))
+
+    def test_shuffled_paper_grades_by_id(self):
+        attempt = self.start()
+        answers = correct_answers(self.exam)
+        self.client.patch(
+            f'/api/attempts/{attempt.pk}/answers/', {'answers': answers}, format='json'
+        )
+        response = self.client.post(f'/api/attempts/{attempt.pk}/finalize/')
+        self.assertEqual(response.json()['score'], 100)
+
+
+class GradingTests(TestCase):
+    def setUp(self):
+        # Questions worth 1, 2, 3 and 4 marks.
+        self.exam = make_exam(4)
+        self.answers = {
+            int(question_id): answer_id for question_id, answer_id in correct_answers(self.exam).items()
+        }
+        self.question_ids = sorted(self.answers)
+
+    def answer_key(self):
+        with self.assertNumQueries(2):
+            return AnswerKey.load(self.exam.pk)
+
+    def wrong_answer(self, question_id):
+        return Answer.objects.get(question_id=question_id, is_correct=False).pk
+
+    def test_score_is_weighted_by_marks(self):
+        answer_key = self.answer_key()
+        self.assertEqual(answer_key.score(self.answers), 100)
+        answers = {**self.answers, self.question_ids[3]: self.wrong_answer(self.question_ids[3])}
+        self.assertEqual(answer_key.score(answers), 60)
+        self.assertEqual(answer_key.score({self.question_ids[0]: self.answers[self.question_ids[0]]}), 10)
+
+    def test_score_rounds_to_whole_percent(self):
+        exam = make_exam(0)
+        for i in range(3):
+            question = Question.objects.create(exam=exam, text=f'Question {i}', marks=1)
+            Answer.objects.create(question=question, text='Right', is_correct=True)
+        answer_key = AnswerKey.load(exam.pk)
+        answers = {question_id: answer_id for answer_id, question_id in answer_key.answer_questions.items()}
+        first, second = list(answers)[:2]
+        self.assertEqual(answer_key.score({first: answers[first]}), 33)
+        self.assertEqual(answer_key.score({first: answers[first], second: answers[second]}), 67)
+
+    def test_exam_without_marks_scores_zero(self):
+        self.assertEqual(AnswerKey.load(make_exam(0).pk).score({}), 0)
+
+    def test_answers_from_other_questions_earn_nothing(self):
+        answer_key = self.answer_key()
+        first, second = self.question_ids[:2]
+        swapped = {**self.answers, first: self.answers[second], second: self.answers[first]}
+        self.assertEqual(answer_key.score(swapped), 70)
+        self.assertEqual(
+            answer_key.validate(swapped),
+            [f"Invalid answer for question {first}", f"Invalid answer for question {second}"]
+        )
+
+    def test_validate_requires_every_question(self):
+        answer_key = self.answer_key()
+        partial = {self.question_ids[0]: self.answers[self.question_ids[0]]}
+        self.assertEqual(answer_key.validate(partial), ["All questions must be answered"])
+        self.assertEqual(answer_key.validate_partial(partial), [])
+
+    def test_submit_records_result(self):
+        candidate = make_candidate(1)
+        response = api_client(candidate.user).post(
+            f'/api/exams/{self.exam.pk}/submit/', {'answers': correct_answers(self.exam)}, format='json'
+        )
+        self.assertEqual(response.json()['score'], 100)
+        result = Result.objects.get(candidate=candidate, exam=self.exam)
+        self.assertTrue(result.is_passed)
@@ -0,0 +1,110 @@
+import io
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from PIL import Image, ImageFile, ImageOps
+
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'JPEG',
+    b'\x89PNG\r\n\x1a\n': 'PNG',
+    b'GIF87a': 'GIF',
+    b'GIF89a': 'GIF',
+}
+
+
+def sniff_image_format(header):
+    """Image format from the file's magic bytes, or None."""
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Validate image uploads while they stream in, before the body has been
+    buffered: the type is checked from the magic bytes, the dimensions from
+    the header as soon as Pillow can parse it, and the size chunk by chunk.
+
+    Chunks are passed through unchanged to the next handler. A rejected
+    file is skipped and its error recorded on request.upload_errors.
+    """
+    def __init__(self, request=None, field_names=('image',)):
+        super().__init__(request)
+        self.field_names = field_names
+        self.config = getattr(settings, 'CANDIDATE_IMAGE_UPLOAD', {})
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in self.field_names
+        self.received = 0
+        self.header = b''
+        self.image_format = None
+        self.parser = ImageFile.Parser()
+        self.size = None
+
+    def record_error(self, message):
+        errors = getattr(self.request, 'upload_errors', {})
+        errors[self.field_name] = [message]
+        self.request.upload_errors = errors
+
+    def reject(self, message):
+        self.record_error(message)
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.received += len(raw_data)
+        max_bytes = self.config.get('MAX_BYTES', 100 * 1024)
+        if self.received > max_bytes:
+            self.reject(f'file cannot be larger than {max_bytes // 1024}kb')
+
+        data = raw_data
+        if self.image_format is None:
+            self.header += raw_data
+            if len(self.header) < 12:
+                return raw_data
+            self.image_format = sniff_image_format(self.header)
+            if self.image_format is None:
+                self.reject('Upload a valid JPEG, PNG, GIF or WebP image.')
+            data, self.header = self.header, b''
+
+        if self.size is None:
+            self.parse_header(data)
+        return raw_data
+
+    def parse_header(self, data):
+        try:
+            self.parser.feed(data)
+        except Exception:
+            self.reject('Upload a valid image. The file is corrupted.')
+        image = self.parser.image
+        if image is None:
+            return
+        if image.format != self.image_format:
+            self.reject('The image content does not match its type.')
+        self.size = image.size
+        max_dimension = self.config.get('MAX_DIMENSION', 4096)
+        if max(self.size) > max_dimension:
+            self.reject(f'image cannot be larger than {max_dimension}x{max_dimension} pixels')
+
+    def file_complete(self, file_size):
+        # Raising here would abort the whole request, so the error is only
+        # recorded and the view refuses the upload.
+        if self.active and self.size is None:
+            self.record_error('Upload a valid image. The file is either not an image or corrupted.')
+        return None
+
+
+def render_variant(source, max_size, quality=80):
+    """Downscale an image file to fit max_size and encode it as WebP."""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        image.thumbnail((max_size, max_size))
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    return ContentFile(buffer.getvalue())
@@ -8,12 +8,19 @@ router.register('candidates', views.CandidateViewSet)
 router.register('exams', views.ExamViewSet)
 router.register('results', views.ResultViewSet, basename='result')
 router.register('questions', views.QuestionViewSet, basename='question')  # Add this line
+router.register('leaderboard', views.LeaderboardViewSet, basename='leaderboard')
+router.register('attempts', views.ExamAttemptViewSet, basename='attempt')
 
 # Nested router for questions under exams
 exams_router = routers.NestedDefaultRouter(router, 'exams', lookup='exam')
 exams_router.register('questions', views.QuestionViewSet, basename='exam-questions')
 
+# Nested router for images under candidates
+candidates_router = routers.NestedDefaultRouter(router, 'candidates', lookup='candidate')
+candidates_router.register('images', views.CandidateImageViewSet, basename='candidate-images')
+
 urlpatterns = [
     path('', include(router.urls)),
     path('', include(exams_router.urls)),
+    path('', include(candidates_router.urls)),
 ]
\ No newline at end of file
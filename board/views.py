@@ -1,25 +1,124 @@
+import os
 from rest_framework import viewsets, status, mixins
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import parse_etags
 from django.core.exceptions import PermissionDenied
 from .models import (
-    Candidate, CandidateImage, Exam, Question, Answer, Result)
+    AttemptClosed, Candidate, CandidateImage, CandidateStats, Exam, ExamAttempt, ExamStats,
+    OutboxEvent, Question, Result)
 from .serializers import ( CandidateSerializer, CandidateImageSerializer,
-    ExamSerializer, QuestionSerializer, ResultSerializer, ExamSubmissionSerializer
+    ExamSerializer, QuestionSerializer, ResultSerializer, ExamSubmissionSerializer,
+    BulkExamSubmissionSerializer, ExamStatsSerializer, LeaderboardEntrySerializer,
+    ExamLeaderboardEntrySerializer, CandidateValuesSerializer, ExamValuesSerializer,
+    ResultValuesSerializer, ExamAttemptSerializer, AttemptAnswersSerializer,
+    AttemptPaperSerializer, get_audience
 )
+from .exports import EXPORT_FORMATS
+from .filters import ResultExportFilter
+from .cache import get_answer_key, get_exam_payload, exam_payload_etag
+from .grading import normalize_answers
+from .importers import PARSERS, QuestionBankError, QuestionImporter, open_text
+from .uploads import ImageUploadHandler
+from .storage import CAS_PREFIX, content_storage
+from .tasks import queue_certificates
+from .pagination import (
+    DefaultPagination, KeysetPaginationMixin, ExamKeysetPagination, ResultKeysetPagination)
 from .permissions import IsAdminUser, IsStudentUser, IsOwnerOrAdmin
+from accounts.authentication import get_principal
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from adminpro.api_docs import (
     candidate_list_schema, candidate_create_schema, candidate_retrieve_schema,
-    exam_list_schema, exam_retrieve_schema, exam_submit_schema,
+    exam_list_schema, exam_retrieve_schema, exam_submit_schema, exam_bulk_submit_schema,
     result_list_schema, result_retrieve_schema,
     question_list_schema, question_create_schema
 )
 
-class CandidateViewSet(mixins.CreateModelMixin, 
+class ValuesListMixin:
+    """
+    Serve list responses from values() rows through the view's
+    values_serializer_class. Ordering columns stay in the rows until the
+    page is cut, so keyset cursors keep working.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        rows = self.values_serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_rows(page))
+        return Response(self.serialize_rows(rows))
+
+    def serialize_rows(self, rows):
+        return self.values_serializer_class.serialize(rows)
+
+def owns_content(candidate_id, name):
+    """Whether a stored file is one of the candidate's images or certificates."""
+    if candidate_id is None:
+        return False
+    return CandidateImage.objects.filter(candidate_id=candidate_id).filter(
+        Q(image=name) | Q(thumbnail=name) | Q(preview=name)
+    ).exists() or Result.objects.filter(candidate_id=candidate_id, certificate_path=name).exists()
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def serve_content(request, path):
+    """
+    Serve a content-addressed media file to an admin or to a candidate whose
+    image or certificate it is. The name is the content hash, so the
+    response never changes and can be cached forever by the client.
+
+    Responses are deliberately private: access is checked per request, so a
+    shared cache or CDN must not store them. Caching these files at a CDN is
+    out of scope here and would need short-lived signed URLs.
+    """
+    name = f'{CAS_PREFIX}/{path}'
+    principal = get_principal(request)
+    if not principal.is_admin and not owns_content(principal.candidate_id, name):
+        raise Http404
+    if not content_storage.exists(name):
+        raise Http404
+    etag = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    headers = {'ETag': etag, 'Cache-Control': 'private, max-age=31536000, immutable'}
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response = FileResponse(content_storage.open(name, 'rb'))
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+def ranked_response(request, queryset, serializer_class, view=None):
+    """
+    Page through a leaderboard ordering and number each row by its
+    position, so ranks stay continuous across pages.
+    """
+    paginator = DefaultPagination()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    for rank, entry in enumerate(page, start=paginator.page.start_index()):
+        entry.position = rank
+    return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+def rank_candidate_id(request):
+    """Candidate to rank: ?candidate= for admins, otherwise the caller."""
+    if get_principal(request).is_admin and request.query_params.get('candidate'):
+        try:
+            return int(request.query_params['candidate'])
+        except ValueError:
+            return None
+    return get_principal(request).candidate_id
+
+class CandidateViewSet(ValuesListMixin,
+                       mixins.CreateModelMixin, 
                        mixins.UpdateModelMixin, 
                        mixins.RetrieveModelMixin, 
                        mixins.ListModelMixin,
@@ -30,14 +129,13 @@ class CandidateViewSet(mixins.CreateModelMixin,
     """
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
+    values_serializer_class = CandidateValuesSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
     
     @swagger_auto_schema(**candidate_list_schema)
-    def list(self, request):
+    def list(self, request, *args, **kwargs):
         """List candidates based on permissions"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
     
     @swagger_auto_schema(**candidate_retrieve_schema)
     def retrieve(self, request, *args, **kwargs):
@@ -59,9 +157,10 @@ class CandidateViewSet(mixins.CreateModelMixin,
     )
     @action(detail=False, methods=['GET', 'PUT'])
     def me(self, request):
-        # Use get to retrieve the candidate for the logged-in user
+        # Load the caller's candidate by the id resolved at authentication
+        candidate_id = get_principal(request).candidate_id
         try:
-            candidate = Candidate.objects.get(user_id=request.user.id)
+            candidate = Candidate.objects.select_related('user').get(pk=candidate_id)
         except Candidate.DoesNotExist:
             return Response({"detail": "Candidate not found."}, status=status.HTTP_404_NOT_FOUND)
         
@@ -74,60 +173,122 @@ class CandidateViewSet(mixins.CreateModelMixin,
             serializer.save()
             return Response(serializer.data)
 
+    def serialize_rows(self, rows):
+        """
+        Embed each candidate's primary image with ?include=primary_image,
+        fetched for the whole page in one query.
+        """
+        data = super().serialize_rows(rows)
+        if 'primary_image' not in self.request.query_params.get('include', '').split(','):
+            return data
+        images = {
+            image.candidate_id: image
+            for image in CandidateImage.objects.filter(
+                candidate_id__in=[row['id'] for row in data], is_primary=True
+            ).only('id', 'candidate_id', 'image', 'thumbnail')
+        }
+        for row in data:
+            image = images.get(row['id'])
+            row['primary_image'] = image and {
+                'id': image.id,
+                'image': self.request.build_absolute_uri(image.image.url),
+                'thumbnail': image.thumbnail and self.request.build_absolute_uri(image.thumbnail.url) or None,
+            }
+        return data
+
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             # Return empty queryset for Swagger schema generation
             return Candidate.objects.none()
             
-        if self.request.user.is_staff and not self.request.user.is_candidate:
+        principal = get_principal(self.request)
+        if principal.is_admin:
             return Candidate.objects.all()
-        return Candidate.objects.filter(user=self.request.user)
+        return Candidate.objects.filter(pk=principal.candidate_id)
     
-    @swagger_auto_schema(
-        operation_summary="List Candidate Images",
-        operation_description="List all images for a specific candidate"
-    )
-    @action(detail=True)
-    def images(self, request, pk=None):
-        """List all images for a specific candidate."""
-        candidate = self.get_object()
-        images = CandidateImage.objects.filter(candidate=candidate)
-        serializer = CandidateImageSerializer(images, many=True)
-        return Response(serializer.data)
-
 class CandidateImageViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing candidate images.
-    Supports file upload and basic CRUD operations.
+    Supports file upload and basic CRUD operations. Uploads are validated
+    while they stream in and resized variants are rendered in the background.
     """
     serializer_class = CandidateImageSerializer
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
 
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            request.upload_handlers.insert(0, ImageUploadHandler(request._request))
+        return request
+
     def get_queryset(self):
-        return CandidateImage.objects.filter(
+        if getattr(self, 'swagger_fake_view', False):
+            # Return empty queryset for Swagger schema generation
+            return CandidateImage.objects.none()
+
+        queryset = CandidateImage.objects.filter(
             candidate_id=self.kwargs['candidate_pk']
         )
+        principal = get_principal(self.request)
+        if principal.is_admin:
+            return queryset
+        return queryset.filter(candidate_id=principal.candidate_id)
+
+    def check_upload(self, request):
+        """Refuse uploads rejected by ImageUploadHandler while streaming."""
+        # Reading request.data parses the body, which runs the upload handlers.
+        _ = request.data
+        # Set on the HttpRequest by the handler; Request proxies attribute reads to it.
+        errors = getattr(request, 'upload_errors', None)
+        if errors:
+            raise ValidationError(errors)
+
+    def create(self, request, *args, **kwargs):
+        self.check_upload(request)
+        return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        self.check_upload(request)
+        return super().update(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_summary="Set Primary Image",
+        operation_description="Make this image the candidate's only primary image"
+    )
+    @action(detail=True, methods=['post'], url_path='set-primary')
+    def set_primary(self, request, candidate_pk=None, pk=None):
+        image = self.get_object()
+        image.set_primary()
+        return Response(self.get_serializer(image).data)
 
     def perform_create(self, serializer):
+        principal = get_principal(self.request)
+        if not principal.is_admin:
+            if str(principal.candidate_id) != self.kwargs['candidate_pk']:
+                raise PermissionDenied(
+                    "You don't have permission to add images for this candidate"
+                )
+            serializer.save(candidate_id=principal.candidate_id)
+            return
         candidate = get_object_or_404(
             Candidate, 
             id=self.kwargs['candidate_pk']
         )
-        if not self.request.user.is_staff and candidate.user != self.request.user:
-            raise PermissionDenied(
-                "You don't have permission to add images for this candidate"
-            )
         serializer.save(candidate=candidate)
 
-class ExamViewSet(viewsets.ModelViewSet):
+class ExamViewSet(KeysetPaginationMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing exams.
     Provides CRUD operations and exam submission functionality.
     """
     queryset = Exam.objects.all()
     serializer_class = ExamSerializer
+    values_serializer_class = ExamValuesSerializer
     permission_classes = [IsAuthenticated]
+    keyset_pagination_class = ExamKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['is_active']
 
     @swagger_auto_schema(**exam_list_schema)
     def list(self, request, *args, **kwargs):
@@ -135,10 +296,31 @@ class ExamViewSet(viewsets.ModelViewSet):
     
     @swagger_auto_schema(**exam_retrieve_schema)
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        """
+        Serve the pre-rendered exam payload for the caller's audience,
+        answering conditional requests with 304 Not Modified. The payload
+        is shared, so it is in canonical order; a candidate sitting the exam
+        reads their own order from /attempts/{id}/paper/.
+        """
+        exam = self.get_object()
+        audience = get_audience(request)
+        etag = exam_payload_etag(exam, audience)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        payload = get_exam_payload(
+            exam,
+            lambda: JSONRenderer().render(self.get_serializer(exam).data),
+            audience
+        )
+        return HttpResponse(payload, content_type='application/json', headers=headers)
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy',
+                           'bulk_submit', 'import_questions', 'stats', 'leaderboard']:
             return [IsAdminUser()]
         return [IsAuthenticated()]
 
@@ -158,26 +340,37 @@ class ExamViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        answer_key = get_answer_key(exam)
         serializer = ExamSubmissionSerializer(
             data=request.data,
-            context={'exam_id': exam.id}
+            context={'exam_id': exam.id, 'answer_key': answer_key}
         )
 
         if serializer.is_valid():
-            candidate = get_object_or_404(Candidate, user=request.user)
+            candidate = get_principal(request).candidate
+            if candidate is None:
+                return Response({"detail": "Candidate not found."}, status=status.HTTP_404_NOT_FOUND)
             
             # Prevent multiple attempts
-            if Result.objects.filter(candidate=candidate, exam=exam).exists():
+            if Result.objects.filter(candidate_id=candidate.id, exam=exam).exists():
                 return Response(
                     {"error": "You have already attempted this exam"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            if ExamAttempt.objects.filter(
+                candidate_id=candidate.id, exam=exam, status=ExamAttempt.IN_PROGRESS
+            ).exists():
+                return Response(
+                    {"error": "Finish your timed attempt at this exam instead"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             # Process answers and calculate score
             result = self._process_exam_submission(
                 candidate, 
                 exam, 
-                serializer.validated_data['answers']
+                serializer.validated_data['answers'],
+                answer_key
             )
             
             return Response(ResultSerializer(result).data)
@@ -187,19 +380,9 @@ class ExamViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    def _process_exam_submission(self, candidate, exam, answers):
+    def _process_exam_submission(self, candidate, exam, answers, answer_key):
         """Helper method to process exam submission and calculate score."""
-        correct_answers = sum(
-            1 for question_id, answer_id in answers.items()
-            if Answer.objects.filter(
-                question_id=question_id,
-                id=answer_id,
-                is_correct=True
-            ).exists()
-        )
-
-        total_questions = exam.questions.count()
-        score = (correct_answers / total_questions) * 100
+        score = answer_key.score(answers)
         is_passed = score >= exam.pass_mark
 
         return Result.objects.create(
@@ -209,6 +392,229 @@ class ExamViewSet(viewsets.ModelViewSet):
             is_passed=is_passed
         )
 
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Start Exam Attempt",
+        operation_description="Start a timed attempt, or resume the caller's attempt in progress"
+    )
+    @action(detail=True, methods=['post'])
+    def start(self, request, pk=None):
+        """Open a timed attempt whose deadline is enforced on the server."""
+        exam = self.get_object()
+        if not exam.is_active:
+            return Response(
+                {"error": "This exam is not active"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        candidate_id = get_principal(request).candidate_id
+        if candidate_id is None:
+            return Response({"detail": "Candidate not found."}, status=status.HTTP_404_NOT_FOUND)
+        if Result.objects.filter(candidate_id=candidate_id, exam=exam).exists():
+            return Response(
+                {"error": "You have already attempted this exam"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        attempt, created = ExamAttempt.start(candidate_id, exam)
+        return Response(
+            ExamAttemptSerializer(attempt).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @swagger_auto_schema(
+        operation_summary="Exam Statistics",
+        operation_description="Attempts, pass rate and average score for an exam"
+    )
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Read the exam's precomputed result rollup."""
+        exam = self.get_object()
+        stats = ExamStats.objects.filter(exam=exam).first() or ExamStats(exam=exam)
+        return Response(ExamStatsSerializer(stats).data)
+
+    @swagger_auto_schema(
+        operation_summary="Exam Leaderboard",
+        operation_description="Results for the exam ranked by score, earliest completion first on ties (admin only)"
+    )
+    @action(detail=True)
+    def leaderboard(self, request, pk=None):
+        """Page through the exam's results in rank order."""
+        exam = self.get_object()
+        queryset = Result.leaderboard(exam.id).select_related('candidate__user')
+        return ranked_response(request, queryset, ExamLeaderboardEntrySerializer, self)
+
+    @swagger_auto_schema(
+        operation_summary="Exam Leaderboard Rank",
+        operation_description="Rank of the current candidate (or ?candidate= for admins) on the exam"
+    )
+    @action(detail=True, url_path='leaderboard/rank')
+    def leaderboard_rank(self, request, pk=None):
+        """Look up one candidate's position on the exam leaderboard."""
+        exam = self.get_object()
+        result = get_object_or_404(
+            Result.objects.select_related('candidate__user'),
+            exam=exam,
+            candidate_id=rank_candidate_id(request)
+        )
+        result.position = result.rank()
+        return Response(ExamLeaderboardEntrySerializer(result).data)
+
+    @swagger_auto_schema(**exam_bulk_submit_schema)
+    @action(detail=True, methods=['post'], url_path='bulk-submit')
+    def bulk_submit(self, request, pk=None):
+        """Grade many candidates' submissions for an exam in one request."""
+        exam = self.get_object()
+        if not exam.is_active:
+            return Response(
+                {"error": "This exam is not active"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = BulkExamSubmissionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        outcomes = self._process_bulk_submission(
+            exam,
+            serializer.validated_data['submissions'],
+            get_answer_key(exam)
+        )
+        return Response({'results': outcomes})
+
+    def _process_bulk_submission(self, exam, submissions, answer_key):
+        """
+        Grade submissions against one answer key and insert the accepted
+        results with a single bulk_create. Returns one outcome per row.
+        """
+        candidate_ids = {submission['candidate'] for submission in submissions}
+        known = set(
+            Candidate.objects.filter(id__in=candidate_ids).values_list('id', flat=True)
+        )
+        attempted = set(
+            Result.objects.filter(exam=exam, candidate_id__in=candidate_ids)
+            .values_list('candidate_id', flat=True)
+        )
+
+        outcomes = []
+        results = {}
+        for index, submission in enumerate(submissions):
+            candidate_id = submission['candidate']
+            outcome = {'index': index, 'candidate': candidate_id, 'status': 'rejected'}
+            outcomes.append(outcome)
+
+            if candidate_id not in known:
+                outcome['error'] = "Candidate not found"
+                continue
+            if candidate_id in attempted or candidate_id in results:
+                outcome['error'] = "Candidate has already attempted this exam"
+                continue
+            try:
+                answers = normalize_answers(submission['answers'])
+            except ValueError:
+                outcome['error'] = "Question IDs must be integers"
+                continue
+            errors = answer_key.validate(answers)
+            if errors:
+                outcome['error'] = errors[0]
+                continue
+
+            score = answer_key.score(answers)
+            results[candidate_id] = Result(
+                candidate_id=candidate_id,
+                exam=exam,
+                score=score,
+                is_passed=score >= exam.pass_mark,
+                completed_at=submission.get('completed_at') or timezone.now()
+            )
+            outcome.update(status='created', score=score, is_passed=score >= exam.pass_mark)
+
+        if results:
+            with transaction.atomic():
+                duplicates = self._insert_results(exam, results)
+                for outcome in outcomes:
+                    if outcome['status'] == 'created' and outcome['candidate'] in duplicates:
+                        del outcome['score'], outcome['is_passed']
+                        outcome.update(status='rejected', error="Candidate has already attempted this exam")
+                if not results:
+                    return outcomes
+                ExamStats.record(results.values())
+                CandidateStats.record(results.values())
+                # Not every backend returns primary keys from bulk_create.
+                result_ids = dict(
+                    Result.objects.filter(exam=exam, candidate_id__in=results.keys())
+                    .values_list('candidate_id', 'id')
+                )
+                OutboxEvent.publish_results(result_ids.values())
+                queue_certificates(
+                    result_ids[candidate_id]
+                    for candidate_id, result in results.items() if result.is_passed
+                )
+            for outcome in outcomes:
+                if outcome['status'] == 'created':
+                    outcome['id'] = result_ids[outcome['candidate']]
+        return outcomes
+
+    def _insert_results(self, exam, results):
+        """
+        Insert {candidate_id: Result} with bulk_create. Candidates whose result
+        was inserted by a concurrent submission are dropped from results and
+        the rest retried; returns the dropped candidate ids.
+        """
+        duplicates = set()
+        while results:
+            try:
+                with transaction.atomic():
+                    Result.objects.bulk_create(results.values(), batch_size=500)
+                break
+            except IntegrityError:
+                # A locking read sees rows committed after this transaction began.
+                conflicting = set(
+                    Result.objects.select_for_update()
+                    .filter(exam=exam, candidate_id__in=results.keys())
+                    .values_list('candidate_id', flat=True)
+                )
+                if not conflicting:
+                    raise
+                duplicates |= conflicting
+                for candidate_id in conflicting:
+                    del results[candidate_id]
+        return duplicates
+
+    @swagger_auto_schema(
+        operation_summary="Import Questions",
+        operation_description="Stream a CSV or JSONL question bank (multipart field 'file') into the exam"
+    )
+    @action(detail=True, methods=['post'], url_path='import-questions',
+            parser_classes=[MultiPartParser, FormParser])
+    def import_questions(self, request, pk=None):
+        """Import questions and answers from an uploaded question bank."""
+        exam = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {"error": "A question bank file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = request.data.get('file_format') or os.path.splitext(upload.name)[1].lstrip('.').lower()
+        if file_format not in PARSERS:
+            return Response(
+                {"error": f"Unsupported format '{file_format}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        importer = QuestionImporter(exam)
+        try:
+            report = importer.run(PARSERS[file_format](open_text(upload.file)))
+        except QuestionBankError as error:
+            return Response(
+                {"error": str(error), "questions": importer.questions, "answers": importer.answers},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(report)
+
 class QuestionViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing exam questions.
@@ -240,22 +646,25 @@ class QuestionViewSet(viewsets.ModelViewSet):
             # Return empty queryset for Swagger schema generation
             return Question.objects.none()
             
+        queryset = Question.objects.prefetch_related('answers')
         if 'exam_pk' in self.kwargs:
-            return Question.objects.filter(exam_id=self.kwargs['exam_pk'])
-        return Question.objects.all()
+            return queryset.filter(exam_id=self.kwargs['exam_pk'])
+        return queryset
         
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['action'] = self.action
         return context
 
-class ResultViewSet(viewsets.ReadOnlyModelViewSet):
+class ResultViewSet(KeysetPaginationMixin, ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing exam results.
     Provides read-only access to results.
     """
     serializer_class = ResultSerializer
+    values_serializer_class = ResultValuesSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    keyset_pagination_class = ResultKeysetPagination
     
     @swagger_auto_schema(**result_list_schema)
     def list(self, request, *args, **kwargs):
@@ -265,18 +674,174 @@ class ResultViewSet(viewsets.ReadOnlyModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
+    def get_permissions(self):
+        if self.action == 'export':
+            return [IsAdminUser()]
+        return super().get_permissions()
+
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             # Return empty queryset for Swagger schema generation
             return Result.objects.none()
             
         # Admin users can see all results
-        if self.request.user.is_staff:
-            return Result.objects.all().select_related('candidate', 'exam')
+        principal = get_principal(self.request)
+        if principal.is_admin:
+            return Result.objects.all().select_related('candidate__user', 'exam')
         
         # Regular users can only see their own results
+        if principal.candidate_id is None:
+            return Result.objects.none()
+        return Result.objects.filter(
+            candidate_id=principal.candidate_id
+        ).select_related('candidate__user', 'exam')
+
+    @swagger_auto_schema(
+        operation_summary="Certificate Status",
+        operation_description="Poll the certificate rendering status of a result"
+    )
+    @action(detail=True)
+    def certificate(self, request, pk=None):
+        """Report whether the certificate for a result has been rendered."""
+        result = self.get_object()
+        data = {
+            'id': result.id,
+            'status': result.certificate_status,
+            'certificate_url': None,
+        }
+        if result.certificate_path:
+            data['certificate_url'] = request.build_absolute_uri(
+                content_storage.url(result.certificate_path)
+            )
+        return Response(data)
+
+    @swagger_auto_schema(
+        operation_summary="Export Results",
+        operation_description=(
+            "Stream results as CSV or JSONL (file_format=csv|jsonl). "
+            "Filter with exam, is_passed, completed_after and completed_before."
+        )
+    )
+    @action(detail=False)
+    def export(self, request):
+        """Stream every matching result without buffering the export."""
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported format '{file_format}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filterset = ResultExportFilter(request.query_params, queryset=Result.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        stream, content_type = EXPORT_FORMATS[file_format]
+        filename = f"results-{timezone.now():%Y%m%d-%H%M%S}.{file_format}"
+        return StreamingHttpResponse(
+            stream(filterset.qs),
+            content_type=content_type,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+class LeaderboardViewSet(viewsets.GenericViewSet):
+    """
+    Overall leaderboard of candidates by average score, read from the
+    CandidateStats rollup. The full ranking is for admins; candidates can
+    look up their own rank.
+    """
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_permissions(self):
+        if self.action == 'list':
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    def get_queryset(self):
+        return CandidateStats.leaderboard().select_related('candidate__user')
+
+    @swagger_auto_schema(
+        operation_summary="Leaderboard",
+        operation_description="Candidates ranked by average score across all exams (admin only)"
+    )
+    def list(self, request):
+        return ranked_response(request, self.get_queryset(), self.get_serializer_class(), self)
+
+    @swagger_auto_schema(
+        operation_summary="Leaderboard Rank",
+        operation_description="Overall rank of the current candidate (or ?candidate= for admins)"
+    )
+    @action(detail=False)
+    def rank(self, request):
+        """Look up one candidate's position on the overall leaderboard."""
+        stats = get_object_or_404(self.get_queryset(), candidate_id=rank_candidate_id(request))
+        stats.position = stats.rank()
+        return Response(self.get_serializer(stats).data)
+
+class ExamAttemptViewSet(mixins.RetrieveModelMixin,
+                         mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    """
+    Timed exam attempts: answers are saved with small PATCHes while the
+    attempt is open and graded by an empty finalize request.
+    """
+    serializer_class = ExamAttemptSerializer
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            # Return empty queryset for Swagger schema generation
+            return ExamAttempt.objects.none()
+
+        queryset = ExamAttempt.objects.select_related('exam')
+        principal = get_principal(self.request)
+        if principal.is_admin:
+            return queryset
+        return queryset.filter(candidate_id=principal.candidate_id)
+
+    @swagger_auto_schema(
+        method='get',
+        responses={200: AttemptPaperSerializer},
+        operation_summary="Attempt Paper",
+        operation_description="The exam's questions and answers in this attempt's order"
+    )
+    @action(detail=True, methods=['get'])
+    def paper(self, request, pk=None):
+        """Questions in a per-attempt order, derived from the attempt's seed."""
+        attempt = self.get_object()
+        return Response(AttemptPaperSerializer(attempt, context={'request': request}).data)
+
+    @swagger_auto_schema(
+        method='patch',
+        request_body=AttemptAnswersSerializer,
+        operation_summary="Save Attempt Answers",
+        operation_description="Merge a few {question_id: answer_id} pairs into the attempt"
+    )
+    @action(detail=True, methods=['patch'])
+    def answers(self, request, pk=None):
+        """Autosave answers; rejected once the deadline has passed."""
+        attempt = self.get_object()
+        serializer = AttemptAnswersSerializer(
+            data=request.data, context={'answer_key': get_answer_key(attempt.exam)}
+        )
+        serializer.is_valid(raise_exception=True)
         try:
-            candidate = Candidate.objects.get(user=self.request.user)
-            return Result.objects.filter(candidate=candidate).select_related('candidate', 'exam')
-        except Candidate.DoesNotExist:
-            return Result.objects.none()
\ No newline at end of file
+            saved = attempt.save_answers(serializer.validated_data['answers'])
+        except AttemptClosed as error:
+            return Response({"error": str(error)}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'answered': len(saved),
+            'remaining_seconds': attempt.remaining_seconds,
+        })
+
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Finalize Attempt",
+        operation_description="Grade the saved answers and record the result"
+    )
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Grade the attempt from its saved answers; the request has no body."""
+        attempt = self.get_object()
+        result = attempt.finalize(get_answer_key(attempt.exam))
+        return Response(ResultSerializer(result).data)
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Notification, Delivery
+
+class DeliveryInline(admin.TabularInline):
+    model = Delivery
+    extra = 0
+    can_delete = False
+    fields = ('recipient', 'status', 'attempts', 'last_error', 'sent_at')
+    readonly_fields = fields
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'created_by', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject',)
+    list_select_related = ['created_by']
+    inlines = [DeliveryInline]
+
+@admin.register(Delivery)
+class DeliveryAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'notification', 'status', 'attempts', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'notification__subject')
+    list_select_related = ['notification']
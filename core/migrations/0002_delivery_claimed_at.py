@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='delivery',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='delivery',
+            index=models.Index(fields=['status', 'claimed_at'], name='core_delive_status_f44216_idx'),
+        ),
+    ]
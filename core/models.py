@@ -1,3 +1,98 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Notification(models.Model):
+    """
+    One email sent to many recipients. Each recipient is tracked as a
+    Delivery so failures can be retried individually.
+    """
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    SENT = 'sent'
+    PARTIAL = 'partial'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (PARTIAL, 'Partially sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.subject
+
+    def refresh_status(self):
+        """Derive the notification status from its deliveries."""
+        counts = dict(
+            self.deliveries.order_by().values_list('status').annotate(models.Count('id'))
+        )
+        if counts.get(Delivery.PENDING) or counts.get(Delivery.SENDING):
+            status = self.SENDING
+        elif not counts.get(Delivery.FAILED):
+            status = self.SENT
+        elif counts.get(Delivery.SENT):
+            status = self.PARTIAL
+        else:
+            status = self.FAILED
+        Notification.objects.filter(pk=self.pk).update(status=status, modified_at=timezone.now())
+        self.status = status
+        return status
+
+
+class Delivery(models.Model):
+    """
+    Delivery state of a notification for one recipient.
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    recipient = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # When a worker claimed the delivery for sending; see reap_stale_deliveries
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'deliveries'
+        unique_together = ['notification', 'recipient']
+        indexes = [
+            models.Index(fields=['notification', 'status']),
+            models.Index(fields=['status', 'claimed_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient} ({self.status})'
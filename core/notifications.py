@@ -0,0 +1,23 @@
+from django.db import transaction
+from .models import Notification, Delivery
+from .task import send_notification
+
+DELIVERY_INSERT_BATCH_SIZE = 1000
+
+
+def notify(recipients, subject, body, created_by=None):
+    """
+    Record a notification with one pending delivery per distinct recipient
+    and queue it for sending once the current transaction commits.
+    """
+    recipients = list(dict.fromkeys(address.strip() for address in recipients if address.strip()))
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            subject=subject, body=body, created_by=created_by
+        )
+        Delivery.objects.bulk_create(
+            (Delivery(notification=notification, recipient=address) for address in recipients),
+            batch_size=DELIVERY_INSERT_BATCH_SIZE
+        )
+        transaction.on_commit(lambda: send_notification.delay(notification.pk))
+    return notification
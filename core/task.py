@@ -1,9 +1,135 @@
-from time import sleep
-from celery import shared_task
+import logging
+from datetime import timedelta
+from celery import shared_task, group
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Notification, Delivery
+
+logger = logging.getLogger(__name__)
+
+
+def delivery_batches(delivery_ids, batch_size=None):
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    delivery_ids = list(delivery_ids)
+    for start in range(0, len(delivery_ids), batch_size):
+        yield delivery_ids[start:start + batch_size]
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2 * base, 4 * base, ..."""
+    return settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1)
+
 
 @shared_task
-def notify_customer(message):
-    print("Sending 10k emails....")
-    print(message)
-    sleep(10)
-    print("Emails successfully sent!")
\ No newline at end of file
+def send_notification(notification_id):
+    """Fan a notification's pending deliveries out to the worker pool in batches."""
+    delivery_ids = Delivery.objects.filter(
+        notification_id=notification_id, status=Delivery.PENDING
+    ).order_by('id').values_list('id', flat=True)
+    batches = list(delivery_batches(delivery_ids))
+    if batches:
+        Notification.objects.filter(pk=notification_id).update(
+            status=Notification.SENDING, modified_at=timezone.now()
+        )
+        group(send_delivery_batch.s(batch) for batch in batches).apply_async()
+    return len(batches)
+
+
+@shared_task(rate_limit=settings.NOTIFICATION_RATE_LIMIT)
+def send_delivery_batch(delivery_ids):
+    """
+    Send one batch of deliveries over a single SMTP connection. Failed
+    recipients are retried on their own with exponential backoff until
+    NOTIFICATION_MAX_ATTEMPTS is reached.
+    """
+    with transaction.atomic():
+        deliveries = list(
+            Delivery.objects.select_for_update(skip_locked=True)
+            .filter(id__in=delivery_ids, status=Delivery.PENDING)
+            .select_related('notification')
+        )
+        Delivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).update(
+            status=Delivery.SENDING, claimed_at=timezone.now()
+        )
+    if not deliveries:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Could not open mail connection: %s", exc)
+        for delivery in deliveries:
+            delivery.attempts += 1
+            delivery.status = Delivery.FAILED
+            delivery.last_error = str(exc)
+    else:
+        try:
+            for delivery in deliveries:
+                delivery.attempts += 1
+                message = EmailMessage(
+                    delivery.notification.subject,
+                    delivery.notification.body,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [delivery.recipient],
+                    connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as exc:
+                    delivery.status = Delivery.FAILED
+                    delivery.last_error = str(exc)
+                else:
+                    delivery.status = Delivery.SENT
+                    delivery.last_error = ''
+                    delivery.sent_at = timezone.now()
+        finally:
+            connection.close()
+
+    retries = {}
+    for delivery in deliveries:
+        if delivery.status == Delivery.FAILED and delivery.attempts < settings.NOTIFICATION_MAX_ATTEMPTS:
+            delivery.status = Delivery.PENDING
+            retries.setdefault(delivery.attempts, []).append(delivery.id)
+    Delivery.objects.bulk_update(deliveries, ['status', 'attempts', 'last_error', 'sent_at'])
+
+    for attempts, ids in retries.items():
+        send_delivery_batch.apply_async((ids,), countdown=retry_delay(attempts))
+    for notification in {delivery.notification for delivery in deliveries}:
+        notification.refresh_status()
+    return sum(delivery.status == Delivery.SENT for delivery in deliveries)
+
+
+@shared_task
+def reap_stale_deliveries():
+    """
+    Release deliveries claimed by a worker that died before recording the
+    outcome. A stale claim counts as a failed attempt: it is queued again,
+    or marked failed once NOTIFICATION_MAX_ATTEMPTS is reached.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        deliveries = list(
+            Delivery.objects.select_for_update(skip_locked=True)
+            .filter(status=Delivery.SENDING)
+            .filter(Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True))
+            .select_related('notification')
+        )
+        for delivery in deliveries:
+            delivery.attempts += 1
+            delivery.last_error = 'Sending worker did not report back'
+            if delivery.attempts < settings.NOTIFICATION_MAX_ATTEMPTS:
+                delivery.status = Delivery.PENDING
+            else:
+                delivery.status = Delivery.FAILED
+        Delivery.objects.bulk_update(deliveries, ['status', 'attempts', 'last_error'])
+
+    retry_ids = [delivery.id for delivery in deliveries if delivery.status == Delivery.PENDING]
+    for batch in delivery_batches(retry_ids):
+        send_delivery_batch.delay(batch)
+    for notification in {delivery.notification for delivery in deliveries}:
+        notification.refresh_status()
+    return len(deliveries)
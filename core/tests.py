@@ -1,3 +1,60 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from .models import Delivery, Notification
+from .task import reap_stale_deliveries
 
-# Create your tests here.
+
+class SendEmailTests(TestCase):
+    def post(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/mails/mails/', {
+            'to': 'someone@example.com', 'subject': 'Hello', 'body': 'Body'
+        }, format='json')
+
+    def test_candidates_cannot_send(self):
+        user = User.objects.create(
+            username='candidate', email='c@example.com', phone_number='1', is_candidate=True
+        )
+        self.assertEqual(self.post(user).status_code, 403)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_admins_can_send(self):
+        user = User.objects.create(
+            username='admin', email='a@example.com', phone_number='2', is_staff=True
+        )
+        self.assertEqual(self.post(user).status_code, 200)
+        self.assertEqual(Notification.objects.get().deliveries.count(), 1)
+
+
+@override_settings(NOTIFICATION_CLAIM_TIMEOUT=60, NOTIFICATION_MAX_ATTEMPTS=3)
+class ReapStaleDeliveriesTests(TestCase):
+    def setUp(self):
+        self.notification = Notification.objects.create(
+            subject='Hello', body='Body', status=Notification.SENDING
+        )
+
+    def delivery(self, recipient, claimed_seconds_ago, attempts=0):
+        return Delivery.objects.create(
+            notification=self.notification, recipient=recipient, status=Delivery.SENDING,
+            attempts=attempts, claimed_at=timezone.now() - timedelta(seconds=claimed_seconds_ago)
+        )
+
+    @mock.patch('core.task.send_delivery_batch.delay')
+    def test_stale_claims_are_requeued(self, delay):
+        stale = self.delivery('stale@example.com', 120)
+        fresh = self.delivery('fresh@example.com', 10)
+        exhausted = self.delivery('exhausted@example.com', 120, attempts=2)
+
+        self.assertEqual(reap_stale_deliveries(), 2)
+        delay.assert_called_once_with([stale.pk])
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (Delivery.PENDING, 1))
+        self.assertEqual(fresh.status, Delivery.SENDING)
+        self.assertEqual(exhausted.status, Delivery.FAILED)
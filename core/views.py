@@ -1,8 +1,9 @@
 from django.shortcuts import render
-from django.core.mail import send_mail, EmailMessage, BadHeaderError
-from .task import notify_customer
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from .notifications import notify
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from board.permissions import IsAdminUser
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from adminpro.api_docs import email_send_schema
@@ -11,10 +12,10 @@ from adminpro.api_docs import email_send_schema
 
 @swagger_auto_schema(method='post', **email_send_schema)
 @api_view(['POST'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAdminUser])
 def send_email(request):
     """
-    Send an email notification.
+    Queue an email notification to one or more recipients. Admin only.
     """
     if request.method == 'POST':
         to = request.data.get('to')
@@ -23,11 +24,22 @@ def send_email(request):
         
         if not all([to, subject, body]):
             return Response({'error': 'Missing required fields'}, status=400)
+
+        recipients = to if isinstance(to, list) else str(to).split(',')
+        recipients = list(dict.fromkeys(str(address).strip() for address in recipients if str(address).strip()))
+        try:
+            for address in recipients:
+                validate_email(address)
+        except ValidationError:
+            return Response({'error': f'Invalid email address: {address}'}, status=400)
         
         try:
-            # Queue the email task
-            notify_customer.delay(body)
-            return Response({'status': 'Email queued successfully'})
+            notification = notify(recipients, subject, body, created_by=request.user)
+            return Response({
+                'status': 'Email queued successfully',
+                'notification': notification.id,
+                'recipients': len(recipients),
+            })
         except Exception as e:
             return Response({'error': str(e)}, status=500)
     